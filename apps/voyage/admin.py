@@ -3,8 +3,22 @@ Voyage admin
 """
 
 from django.contrib import admin
+from django.core.exceptions import (
+    ObjectDoesNotExist,
+    PermissionDenied,
+    ValidationError,
+)
+from django.db.models import Count, OuterRef
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.html import format_html
+from django.utils.http import urlencode
+from project.routers import replica_reads
+from .forms import GradingFormSet
 from .models import (
+    DeadlineDigest,
+    DeadlineRun,
     Faculty,
     Content,
     Program,
@@ -13,6 +27,134 @@ from .models import (
     Assignment,
     StudentAssignment,
 )
+from .utils.aggregates import subquery_count
+from .utils.analytics import cohort_statistics
+from .utils.grading import save_grades
+
+# rows per grading page; each row posts three fields and Django refuses
+# requests of more than DATA_UPLOAD_MAX_NUMBER_FIELDS (1000 by default)
+GRADING_PAGE_SIZE = 200
+
+
+def rollup_count(obj, field):
+    """
+    a count from the object's grade rollup, zero if it has none yet
+    """
+    try:
+        return getattr(obj.grade_rollup, field)
+    except ObjectDoesNotExist:
+        return 0
+
+
+def changelist_link(model_name, count, **filters):
+    """
+    link to the changelist of model_name narrowed by its list_filter
+    lookups, e.g. program__id__exact=1
+    """
+    if not count:
+        return 0
+    return format_html(
+        '<a href="{}?{}">{}</a>',
+        reverse(f"admin:voyage_{model_name}_changelist"),
+        urlencode(filters),
+        count,
+    )
+
+
+class SelectedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    RelatedFieldListFilter that only lists the selected object, for
+    relations too large to list every choice; it shows up once a
+    changelist link selects one
+    """
+
+    def field_choices(self, field, request, model_admin):
+        """
+        over-riding
+        """
+        if self.lookup_val is None:
+            return []
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        try:
+            return field.get_choices(
+                include_blank=False,
+                ordering=ordering,
+                limit_choices_to={"pk": self.lookup_val},
+            )
+        except (ValueError, ValidationError):
+            return []
+
+    def has_output(self):
+        """
+        over-riding: a filter without output is not applied at all
+        """
+        return self.lookup_val is not None
+
+
+class GradeStatisticsAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin with a grade statistics page per object, at
+    <id>/statistics/, linked from the changelist.
+
+    - statistics_scope: the cohort_statistics argument the object fills
+    """
+
+    statistics_scope = None
+
+    def get_urls(self):
+        """
+        over-riding
+        """
+        opts = self.model._meta
+        return [
+            path(
+                "<int:object_id>/statistics/",
+                self.admin_site.admin_view(self.statistics_view),
+                name=f"{opts.app_label}_{opts.model_name}_statistics",
+            ),
+        ] + super().get_urls()
+
+    def statistics_view(self, request, object_id):
+        """
+        grade statistics of one object
+        """
+        # not get_object(): the changelist queryset carries its annotations
+        obj = self.model._default_manager.filter(pk=object_id).first()
+        if not self.has_view_permission(request, obj):
+            raise PermissionDenied
+        if obj is None:
+            return self._get_obj_does_not_exist_redirect(
+                request, self.model._meta, str(object_id)
+            )
+        with replica_reads():
+            statistics = cohort_statistics(**{self.statistics_scope: obj.pk})
+        peak = max((row["count"] for row in statistics["histogram"]), default=0)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "original": obj,
+            "title": f"Grade statistics: {obj}",
+            "statistics": statistics,
+            "histogram": [
+                {**row, "width": round(100 * row["count"] / peak) if peak else 0}
+                for row in statistics["histogram"]
+            ],
+        }
+        return TemplateResponse(request, "voyage/grade-statistics.html", context)
+
+    def grade_statistics(self, obj):
+        """
+        link to the grade statistics page
+        """
+        opts = self.model._meta
+        return format_html(
+            '<a href="{}">Statistics</a>',
+            reverse(
+                f"admin:{opts.app_label}_{opts.model_name}_statistics", args=[obj.pk]
+            ),
+        )
+
+    grade_statistics.short_description = "Grade Statistics"
 
 
 @admin.register(Faculty)
@@ -28,67 +170,61 @@ class FacultyAdmin(admin.ModelAdmin):
         "num_assignments",
         "num_assignments_graded",
     )
+    list_select_related = ("user",)
+
+    def get_queryset(self, request):
+        """
+        annotate counts for the changelist columns
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                courses_count=Count("content__assignment__course", distinct=True),
+                assignments_count=Count("content__assignment", distinct=True),
+                graded_count=subquery_count(
+                    StudentAssignment.objects.filter(
+                        reviewer=OuterRef("pk"), grade__isnull=False
+                    )
+                ),
+            )
+        )
 
     def num_courses_taught(self, obj):
         """
         number of courses taught by each faculty.
         """
-        # courses = len(obj.courses())
-        # if courses > 0:
-        #     courses_url = reverse("admin:voyage_course_changelist")
-        #     faculty_courses_url = f"{courses_url}?faculty__id__exact={obj.id}"
-        #     return format_html('<a href="{}">{}</a>', faculty_courses_url, courses)
-        # return courses
-
-        # courses = obj.courses()
-        # if courses:
-        #     links = []
-        #     for course in courses:
-        #         url = reverse("admin:voyage_course_change", args=[course.id])
-        #         links.append(f'<option> <a href="{url}">{course.name}</a> </option>')
-        #     return format_html("\n".join(links))
-        # return 0
-
-        courses = obj.courses()
-        unique_id = [course.id for course in courses]
-        if courses:
-            url = '<a href="/admin/voyage/course/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(courses)}</a>')
-        return 0
+        return changelist_link(
+            "course", obj.courses_count, assignment__content__faculty__id__exact=obj.pk
+        )
 
     num_courses_taught.short_description = "Courses Taught"
+    num_courses_taught.admin_order_field = "courses_count"
 
     def num_assignments(self, obj):
         """
         number of assignments created by each faculty.
         """
-        assignments = obj.num_assignments()
-        unique_id = [assignment.id for assignment in assignments]
-        if assignments:
-            url = '<a href="/admin/voyage/assignment/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(assignments)}')
-        return 0
+        return changelist_link(
+            "assignment", obj.assignments_count, content__faculty__id__exact=obj.pk
+        )
 
     num_assignments.short_description = "Assignments Created"
+    num_assignments.admin_order_field = "assignments_count"
 
     def num_assignments_graded(self, obj):
         """
         number of assignments graded by each faculty.
         """
-        assignments = obj.assignments_graded()
-        unique_id = [assignment.id for assignment in assignments]
-        if assignments:
-            url = '<a href="/admin/voyage/studentassignment/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(assignments)}')
-        return 0
+        return changelist_link(
+            "studentassignment",
+            obj.graded_count,
+            reviewer__id__exact=obj.pk,
+            grade__isempty=0,
+        )
 
     num_assignments_graded.short_description = "Assignments Graded"
+    num_assignments_graded.admin_order_field = "graded_count"
 
 
 @admin.register(Student)
@@ -106,62 +242,83 @@ class StudentAdmin(admin.ModelAdmin):
         "num_assignments_submitted",
         "average_grade",
     )
+    list_select_related = ("user", "program", "grade_rollup")
+    list_filter = ("program",)
+
+    def get_queryset(self, request):
+        """
+        annotate counts for the changelist columns
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                courses_count=subquery_count(
+                    Assignment.objects.filter(program=OuterRef("program")),
+                    "course",
+                    distinct=True,
+                ),
+                # subqueries, so only the page's rows are counted and the
+                # counts are of the rows the changelist links show
+                assigned_count=subquery_count(
+                    StudentAssignment.objects.filter(student=OuterRef("pk"))
+                ),
+                submitted_count=subquery_count(
+                    StudentAssignment.objects.filter(
+                        student=OuterRef("pk"), submitted__isnull=False
+                    )
+                ),
+            )
+        )
 
     def program_name(self, obj):
         """
         program each student is enrolled in.
         """
-        program = obj.program
-        program_id = program.id
-        url = f"<a href=/admin/voyage/program/{program_id}/change/>{program}</a>"
-        return format_html(url)
+        return format_html(
+            '<a href="/admin/voyage/program/{}/change/">{}</a>',
+            obj.program_id,
+            obj.program,
+        )
 
     program_name.short_description = "Program"
+    program_name.admin_order_field = "program__name"
 
     def num_courses_enrolled(self, obj):
         """
         number of courses each student is enrolled in.
         """
-        courses = obj.courses()
-        unique_id = [course.id for course in courses]
-        if courses:
-            url = '<a href="/admin/voyage/course/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(courses)}')
-        return 0
+        return changelist_link(
+            "course", obj.courses_count, assignment__program__id__exact=obj.program_id
+        )
 
     num_courses_enrolled.short_description = "Courses Enrolled"
+    num_courses_enrolled.admin_order_field = "courses_count"
 
     def num_assignments_assigned(self, obj):
         """
         number of assignments assigned to each student.
         """
-        assignments = obj.assignments()
-        unique_id = [assignment.id for assignment in assignments]
-        if assignments:
-            url = '<a href="/admin/voyage/studentassignment/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(assignments)}')
-        return 0
+        return changelist_link(
+            "studentassignment", obj.assigned_count, student__id__exact=obj.pk
+        )
 
     num_assignments_assigned.short_description = "Assignments Assigned"
+    num_assignments_assigned.admin_order_field = "assigned_count"
 
     def num_assignments_submitted(self, obj):
         """
         number of assignments submitted by each student.
         """
-        assignments = obj.assignments_submitted()
-        unique_id = [assignment.id for assignment in assignments]
-        if assignments:
-            url = '<a href="/admin/voyage/studentassignment/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(assignments)}')
-        return 0
+        return changelist_link(
+            "studentassignment",
+            obj.submitted_count,
+            student__id__exact=obj.pk,
+            submitted__isempty=0,
+        )
 
     num_assignments_submitted.short_description = "Assignments Submitted"
+    num_assignments_submitted.admin_order_field = "submitted_count"
 
     def average_grade(self, obj):
         """
@@ -180,113 +337,142 @@ class ContentAdmin(admin.ModelAdmin):
 
     list_display = ("name", "num_courses_used", "num_assignments_used")
 
+    def get_queryset(self, request):
+        """
+        annotate counts for the changelist columns
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                courses_count=Count("assignment__course", distinct=True),
+                assignments_count=Count("assignment", distinct=True),
+            )
+        )
+
     def num_courses_used(self, obj):
         """
         number of courses
         """
-        courses = obj.courses()
-        unique_id = [course.id for course in courses]
-        if courses:
-            url = '<a href="/admin/voyage/course/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(courses)}</a>')
-        return 0
+        return changelist_link(
+            "course", obj.courses_count, assignment__content__id__exact=obj.pk
+        )
 
     num_courses_used.short_description = "Courses Used"
+    num_courses_used.admin_order_field = "courses_count"
 
     def num_assignments_used(self, obj):
         """
         assignments that use each content.
         """
-        assignments = obj.assignments()
-        unique_id = [assignment.id for assignment in assignments]
-        if assignments:
-            url = '<a href="/admin/voyage/assignment/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(assignments)}')
-        return 0
+        return changelist_link(
+            "assignment", obj.assignments_count, content__id__exact=obj.pk
+        )
 
     num_assignments_used.short_description = "Assignments Used"
+    num_assignments_used.admin_order_field = "assignments_count"
 
 
 @admin.register(Program)
-class ProgramAdmin(admin.ModelAdmin):
+class ProgramAdmin(GradeStatisticsAdmin):
     """
     Program
     """
 
-    list_display = ("name", "num_courses", "num_students")
+    list_display = ("name", "num_courses", "num_students", "grade_statistics")
+    statistics_scope = "program"
+
+    def get_queryset(self, request):
+        """
+        annotate counts for the changelist columns
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                courses_count=Count("assignment__course", distinct=True),
+                students_count=subquery_count(
+                    Student.objects.filter(program=OuterRef("pk"))
+                ),
+            )
+        )
 
     def num_courses(self, obj):
         """
         number of courses in each program.
         """
-        courses = obj.courses()
-        unique_id = [course.id for course in courses]
-        if courses:
-            url = '<a href="/admin/voyage/course/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(courses)}</a>')
-        return 0
+        return changelist_link(
+            "course", obj.courses_count, assignment__program__id__exact=obj.pk
+        )
 
     num_courses.short_description = "Courses"
+    num_courses.admin_order_field = "courses_count"
 
     def num_students(self, obj):
         """
         number of students in each program.
         """
-        students = obj.students()
-        unique_id = [student.id for student in students]
-        if students:
-            url = '<a href="/admin/voyage/student/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(students)}')
-        return 0
+        return changelist_link("student", obj.students_count, program__id__exact=obj.pk)
 
     num_students.short_description = "Students"
+    num_students.admin_order_field = "students_count"
 
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(GradeStatisticsAdmin):
     """
     Course
     """
 
-    list_display = ("name", "num_assignments", "num_completed_assignments")
+    list_display = (
+        "name",
+        "num_assignments",
+        "num_completed_assignments",
+        "grade_statistics",
+    )
+    statistics_scope = "course"
+    list_select_related = ("grade_rollup",)
+    list_filter = (
+        "assignment__program",
+        "assignment__content__faculty",
+        "assignment__content",
+    )
+
+    def get_queryset(self, request):
+        """
+        annotate counts for the changelist columns
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                assignments_count=Count("assignment", distinct=True),
+            )
+        )
 
     def num_assignments(self, obj):
         """
         number of assignments in each course.
         """
-        assignments = obj.assignments
-        unique_id = [assignment.id for assignment in assignments]
-        if assignments:
-            url = '<a href="/admin/voyage/assignment/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(assignments)}')
-        return 0
+        return changelist_link(
+            "assignment", obj.assignments_count, course__id__exact=obj.pk
+        )
 
     num_assignments.short_description = "Assignments"
+    num_assignments.admin_order_field = "assignments_count"
 
     def num_completed_assignments(self, obj):
         """
         number of assignments that are completed and graded 100%
         """
-        assignments = obj.completed_assignments()
-        unique_id = [assignment.id for assignment in assignments]
-        if assignments:
-            url = '<a href="/admin/voyage/assignment/?id__in='
-            for i in unique_id:
-                url = "".join((url, f"{i},"))
-            return format_html(url[:-1] + f'">{len(assignments)}')
-        return 0
+        return changelist_link(
+            "studentassignment",
+            rollup_count(obj, "count"),
+            assignment__course__id__exact=obj.pk,
+        )
 
     num_completed_assignments.short_description = "Completed Assignments"
+    num_completed_assignments.admin_order_field = "grade_rollup__count"
 
 
 @admin.register(Assignment)
@@ -304,7 +490,86 @@ class AssignmentAdmin(admin.ModelAdmin):
         "instructions",
         "rubric",
         "average_grade",
+        "grade_submissions",
     )
+    list_select_related = ("program", "course", "content", "grade_rollup")
+    list_filter = ("program", "course", "content__faculty", "content")
+
+    def get_urls(self):
+        """
+        over-riding
+        """
+        opts = self.model._meta
+        return [
+            path(
+                "<int:object_id>/grading/",
+                self.admin_site.admin_view(self.grading_view),
+                name=f"{opts.app_label}_{opts.model_name}_grading",
+            ),
+        ] + super().get_urls()
+
+    def grading_view(self, request, object_id):
+        """
+        grid of the StudentAssignments of one assignment, GRADING_PAGE_SIZE
+        rows a page by ?after=<id>; the changed rows of a submitted page are
+        saved together by save_grades, reviewed by the user's faculty
+        """
+        obj = (
+            self.model._default_manager.select_related("program", "course", "content")
+            .filter(pk=object_id)
+            .first()
+        )
+        if not request.user.has_perm("voyage.change_studentassignment"):
+            raise PermissionDenied
+        if obj is None:
+            return self._get_obj_does_not_exist_redirect(
+                request, self.model._meta, str(object_id)
+            )
+
+        rows = (
+            StudentAssignment.objects.filter(assignment=obj)
+            .select_related("student__user", "reviewer__user")
+            .order_by("id")
+        )
+        after = request.GET.get("after", "")
+        if after.isdigit():
+            rows = rows.filter(id__gt=int(after))
+        rows = list(rows[: GRADING_PAGE_SIZE + 1])
+        page = rows[:GRADING_PAGE_SIZE]
+        formset = GradingFormSet(
+            request.POST if request.method == "POST" else None,
+            initial=[
+                {"id": row.pk, "grade": row.grade, "feedback": row.feedback}
+                for row in page
+            ],
+        )
+        if request.method == "POST" and formset.is_valid():
+            submissions = {row.pk: row for row in page}
+            changed = []
+            for form in formset:
+                submission = submissions.get(form.cleaned_data["id"])
+                if submission is None or not form.has_changed():
+                    continue
+                submission.grade = form.cleaned_data["grade"]
+                submission.feedback = form.cleaned_data["feedback"] or None
+                changed.append(submission)
+            written = save_grades(
+                changed, reviewer=Faculty.objects.filter(user=request.user).first()
+            )
+            self.message_user(request, f"{written} grades saved")
+            return redirect(request.get_full_path())
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "original": obj,
+            "title": f"Grading: {obj}",
+            "formset": formset,
+            "rows": list(zip(formset.forms, page)),
+            "is_first_page": not after.isdigit(),
+            "next_after": page[-1].pk if len(rows) > GRADING_PAGE_SIZE else None,
+        }
+        return TemplateResponse(request, "voyage/grading.html", context)
 
     def average_grade(self, obj):
         """
@@ -314,6 +579,18 @@ class AssignmentAdmin(admin.ModelAdmin):
 
     average_grade.short_description = "Average Grade"
 
+    def grade_submissions(self, obj):
+        """
+        link to the grading grid
+        """
+        opts = self.model._meta
+        return format_html(
+            '<a href="{}">Grade</a>',
+            reverse(f"admin:{opts.app_label}_{opts.model_name}_grading", args=[obj.pk]),
+        )
+
+    grade_submissions.short_description = "Grading"
+
 
 @admin.register(StudentAssignment)
 class StudentAssignmentAdmin(admin.ModelAdmin):
@@ -327,9 +604,20 @@ class StudentAssignmentAdmin(admin.ModelAdmin):
         "assignment",
         "grade",
         "submitted",
+        "status",
         "reviewed",
         "reviewer_username",
     )
+    list_select_related = ("student__user", "assignment__content", "reviewer__user")
+    list_filter = (
+        ("student", SelectedRelatedFieldListFilter),
+        ("assignment", SelectedRelatedFieldListFilter),
+        "assignment__course",
+        "reviewer",
+        ("grade", admin.EmptyFieldListFilter),
+        ("submitted", admin.EmptyFieldListFilter),
+        "status",
+    )
 
     def student_username(self, obj):
         """
@@ -343,6 +631,37 @@ class StudentAssignmentAdmin(admin.ModelAdmin):
         """
         return reviewer name
         """
+        if obj.reviewer is None:
+            return None
         return obj.reviewer.user
 
     reviewer_username.short_description = "Reviewer"
+
+
+class DeadlineDigestInline(admin.TabularInline):
+    """
+    per-program digests of a deadline run
+    """
+
+    model = DeadlineDigest
+    fields = ("program", "assignments", "on_time", "late", "missing")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(DeadlineRun)
+class DeadlineRunAdmin(admin.ModelAdmin):
+    """
+    Deadline Run
+    """
+
+    list_display = ("through", "assignments")
+    readonly_fields = ("through", "assignments")
+    inlines = (DeadlineDigestInline,)
+
+    def has_add_permission(self, request):
+        """
+        runs are recorded by the deadline task
+        """
+        return False
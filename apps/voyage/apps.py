@@ -9,7 +9,7 @@ class VoyageConfig(AppConfig):
     def ready(self):
         # pylint: disable=unused-import
         # pylint: disable=import-outside-toplevel
-        from . import signals
+        from . import checks, signals
 
         if settings.DEBUG:
             print("Loaded aperture signals")
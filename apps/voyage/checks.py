@@ -0,0 +1,28 @@
+"""
+Voyage system checks
+"""
+
+from django.core.checks import Tags, Warning, register
+
+from .utils import cache
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    the page cache generation must be shared by every process
+    """
+    if cache.shared():
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "Saves in one process, Celery tasks and management commands "
+                "do not retire the voyage pages cached by the others, which "
+                "stay stale for VOYAGE_CACHE_TIMEOUT. Set CACHE_TYPE=file or "
+                "use a shared cache backend."
+            ),
+            id="voyage.W001",
+        )
+    ]
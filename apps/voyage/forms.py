@@ -39,3 +39,43 @@ class AssignmentForm(forms.ModelForm):
             "instructions": forms.Textarea(attrs={"class": "form-control"}),
             "rubric": forms.Textarea(attrs={"class": "form-control"}),
         }
+
+
+class GradebookImportForm(forms.Form):
+    """
+    CSV upload for the bulk gradebook import
+    """
+
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(
+            attrs={"class": "form-control", "accept": ".csv"}
+        )
+    )
+    batch_size = forms.IntegerField(
+        min_value=1,
+        max_value=10000,
+        initial=1000,
+        widget=forms.NumberInput(attrs={"class": "form-control"}),
+    )
+
+
+class GradingForm(forms.Form):
+    """
+    grade and feedback of one StudentAssignment in the bulk grading grid
+    """
+
+    id = forms.IntegerField(widget=forms.HiddenInput)
+    grade = forms.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        required=False,
+        widget=forms.NumberInput(attrs={"step": "0.01", "style": "width: 6em;"}),
+    )
+    feedback = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 1, "cols": 60}),
+    )
+
+
+# a plain formset: a model formset validates every row's id with its own query
+GradingFormSet = forms.formset_factory(GradingForm, extra=0)
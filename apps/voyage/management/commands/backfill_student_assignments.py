@@ -0,0 +1,31 @@
+"""
+Backfill StudentAssignment rows
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.voyage.utils.materialize import backfill
+
+
+class Command(BaseCommand):
+    """
+    create the missing StudentAssignment of every student and assignment of
+    a program, chunk by chunk
+    """
+
+    help = "Create missing StudentAssignment rows for existing programs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--program", type=int, action="append", help="program id, repeatable"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000, help="students per transaction"
+        )
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options["verbosity"] > 1 else None
+        created = backfill(
+            programs=options["program"], chunk_size=options["chunk_size"], log=log
+        )
+        self.stdout.write(f"{created} rows created")
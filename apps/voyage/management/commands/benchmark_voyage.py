@@ -0,0 +1,240 @@
+"""
+Benchmark voyage pages and admin changelists
+"""
+
+import json
+import subprocess
+import time
+import tracemalloc
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from apps.voyage.models import Assignment, Faculty, RepoProvisioning, Student
+from apps.voyage.urls import appurls
+from apps.voyage.utils import cache
+from apps.voyage.utils.seed import Seeder
+
+# data set at scale 1; every size is multiplied by the scale except faculty,
+# programs, courses and assignments per program which stay fixed
+BASE_SIZES = {
+    "faculty": 5,
+    "programs": 3,
+    "courses": 5,
+    "content": 20,
+    "assignments": 10,
+    "students": 50,
+    "submissions": 400,
+}
+SCALED = ("students", "submissions")
+
+# models whose first row fills the url parameters of appurls
+URL_KWARGS = {
+    "assignment_id": Assignment,
+    "faculty_id": Faculty,
+    "student_id": Student,
+}
+
+
+def git_commit():
+    """
+    current commit, if run from a git checkout
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def voyage_urls():
+    """
+    {name: url} for every app url and every voyage admin changelist
+    """
+    urls = {}
+    for pattern in appurls.urlpatterns:
+        kwargs = {
+            name: URL_KWARGS[name]
+            .objects.order_by("id")
+            .values_list("id", flat=True)[0]
+            for name in pattern.pattern.converters
+        }
+        urls[pattern.name] = reverse(pattern.name, kwargs=kwargs)
+    for model in admin.site._registry:
+        opts = model._meta
+        if opts.app_label == "voyage":
+            name = f"admin:{opts.app_label}_{opts.model_name}_changelist"
+            urls[name] = reverse(name)
+    return urls
+
+
+def measure(client, url):
+    """
+    query count, SQL time, wall time and peak memory of a GET.
+
+    the cache generation is bumped before each measured request, so the
+    page is computed rather than served from the page cache; the cached
+    cost is recorded separately as warm_queries and warm_ms. memory is
+    traced on a further request so tracing does not inflate the timings.
+    """
+    cache.bump()
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    wall = time.perf_counter() - started
+    # read the log before the next request resets it
+    queries = context.captured_queries
+
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    warm = time.perf_counter() - started
+    warm_queries = len(context.captured_queries)
+
+    cache.bump()
+    tracemalloc.start()
+    client.get(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "status": response.status_code,
+        "queries": len(queries),
+        "sql_ms": round(sum(float(query["time"]) for query in queries) * 1000, 2),
+        "wall_ms": round(wall * 1000, 2),
+        "peak_kb": round(peak / 1024, 1),
+        "warm_queries": warm_queries,
+        "warm_ms": round(warm * 1000, 2),
+    }
+
+
+class Command(BaseCommand):
+    """
+    seed a throwaway test database at several scales, GET every voyage page
+    and admin changelist, record costs as JSON and check them against
+    thresholds
+    """
+
+    help = "Benchmark query count and latency of voyage pages and admin"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales", default="1,10,100", help="comma separated data multipliers"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--repeat", type=int, default=3, help="runs per page")
+        parser.add_argument("--output", default=None, help="write results to JSON")
+        parser.add_argument(
+            "--exclude", action="append", default=[], help="page name to skip"
+        )
+        parser.add_argument(
+            "--thresholds",
+            default=None,
+            help='JSON of {"default"|page: {"queries"|"sql_ms"|"wall_ms"|"peak_kb": max}}',
+        )
+        parser.add_argument(
+            "--max-query-growth",
+            type=int,
+            default=0,
+            help="allowed increase in query count from the smallest to largest scale",
+        )
+
+    def handle(self, *args, **options):
+        scales = [int(scale) for scale in options["scales"].split(",")]
+        thresholds = {}
+        if options["thresholds"]:
+            with open(options["thresholds"], encoding="utf-8") as handle:
+                thresholds = json.load(handle)
+
+        setup_test_environment()
+        try:
+            results = {str(scale): self.run_scale(scale, options) for scale in scales}
+        finally:
+            teardown_test_environment()
+
+        report = {"commit": git_commit(), "scales": results}
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        failures = self.check_results(results, thresholds, options["max_query_growth"])
+        if failures:
+            raise CommandError("\n".join(failures))
+
+    def run_scale(self, scale, options):
+        """
+        results for every page at one scale, on a fresh test database
+        """
+        sizes = {
+            name: size * scale if name in SCALED else size
+            for name, size in BASE_SIZES.items()
+        }
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            Seeder(seed=options["seed"]).run(**sizes)
+            # the provisioning page of the first assignment needs a run to show
+            RepoProvisioning.objects.create(
+                assignment=Assignment.objects.order_by("id").first(),
+                total=Student.objects.count(),
+            )
+            client = Client(raise_request_exception=False)
+            client.force_login(
+                get_user_model().objects.create_superuser(
+                    "benchmark", "benchmark@example.com", "benchmark"
+                )
+            )
+            pages = {}
+            for name, url in voyage_urls().items():
+                if name in options["exclude"]:
+                    continue
+                runs = [measure(client, url) for _ in range(options["repeat"])]
+                best = min(runs, key=lambda run: run["wall_ms"])
+                pages[name] = {"url": url, **best}
+                self.stdout.write(
+                    f"{scale:>4}x {name:<55} {best['queries']:>4}q "
+                    f"{best['sql_ms']:>9.2f}ms sql {best['wall_ms']:>9.2f}ms wall"
+                )
+            return {"sizes": sizes, "pages": pages}
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def check_results(self, results, thresholds, max_query_growth):
+        """
+        threshold and query growth violations
+        """
+        failures = []
+        default = thresholds.get("default", {})
+        for scale, result in results.items():
+            for name, page in result["pages"].items():
+                if page["status"] != 200:
+                    failures.append(f"{scale}x {name}: HTTP {page['status']}")
+                for metric, limit in {**default, **thresholds.get(name, {})}.items():
+                    if page[metric] > limit:
+                        failures.append(
+                            f"{scale}x {name}: {metric} {page[metric]} > {limit}"
+                        )
+
+        if len(results) > 1:
+            smallest, *_, largest = results.values()
+            for name, page in largest["pages"].items():
+                growth = page["queries"] - smallest["pages"][name]["queries"]
+                if growth > max_query_growth:
+                    failures.append(
+                        f"{name}: query count grew by {growth} across scales"
+                    )
+        return failures
@@ -0,0 +1,35 @@
+"""
+Check query plans of the voyage hot filters
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.voyage.utils.plans import hot_queries, uses_index
+
+
+class Command(BaseCommand):
+    """
+    run EXPLAIN QUERY PLAN for each hot query and fail when the plan does not
+    use the index the query is meant for
+    """
+
+    help = "Verify that the voyage hot filters are served by their index (SQLite)"
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Query plans are only checked on SQLite")
+
+        misses = []
+        for name, (queryset, index) in hot_queries().items():
+            plan = queryset.explain()
+            ok = uses_index(plan, index)
+            status = "ok" if ok else "MISS"
+            self.stdout.write(f"{status:>4}  {name} ({index})")
+            if options["verbosity"] > 1 or not ok:
+                self.stdout.write(plan)
+            if not ok:
+                misses.append(f"{name} does not use {index}")
+
+        if misses:
+            raise CommandError("; ".join(misses))
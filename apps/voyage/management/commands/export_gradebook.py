@@ -0,0 +1,48 @@
+"""
+Export gradebooks
+"""
+
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.voyage.utils.export import csv_lines, gradebook_rows, write_parquet
+
+
+class Command(BaseCommand):
+    """
+    stream StudentAssignment rows of a program and/or course to CSV or Parquet
+    """
+
+    help = "Export a voyage gradebook as CSV or Parquet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--program", type=int, default=None)
+        parser.add_argument("--course", type=int, default=None)
+        parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+        parser.add_argument(
+            "--output", default=None, help="file to write, stdout for CSV if omitted"
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = gradebook_rows(
+            program=options["program"],
+            course=options["course"],
+            chunk_size=options["chunk_size"],
+        )
+        if options["format"] == "parquet":
+            if not options["output"]:
+                raise CommandError("--output is required for Parquet")
+            try:
+                write_parquet(rows, options["output"])
+            except ImproperlyConfigured as exc:
+                raise CommandError(str(exc)) from exc
+            return
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as handle:
+                handle.writelines(csv_lines(rows))
+        else:
+            sys.stdout.writelines(csv_lines(rows))
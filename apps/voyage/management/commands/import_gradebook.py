@@ -0,0 +1,36 @@
+"""
+Import gradebooks
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.voyage.utils.importer import GradebookImport
+
+
+class Command(BaseCommand):
+    """
+    apply grades from a CSV of student, assignment_id, grade, feedback and
+    reviewer columns
+    """
+
+    help = "Bulk import voyage grades from CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="rows per transaction"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8", newline="") as handle:
+                result = GradebookImport(batch_size=options["batch_size"]).run(handle)
+        except OSError as exc:
+            raise CommandError(exc) from exc
+
+        for error in result.errors:
+            self.stderr.write(f"line {error.line}: {error.message}")
+        self.stdout.write(
+            f"{result.updated} updated, {result.created} created, "
+            f"{result.unchanged} unchanged, {len(result.errors)} errors"
+        )
@@ -0,0 +1,139 @@
+"""
+Load test the sync and async voyage pages
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from apps.voyage.models import Faculty, Student
+
+# sync page, its async counterpart and the model whose ids fill the url
+PAGES = {
+    "faculty_dashboard": ("async_faculty_dashboard", "faculty_id", Faculty),
+    "student_dashboard": ("async_student_dashboard", "student_id", Student),
+    "student_assignment": ("async_student_assignment", "student_id", Student),
+}
+
+
+def summarize(latencies, elapsed, errors):
+    """
+    throughput and latency percentiles of one run
+    """
+    latencies = sorted(latencies)
+    return {
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "errors": errors,
+    }
+
+
+def run_wsgi(urls, concurrency):
+    """
+    GET urls through the WSGI handler from concurrency threads
+    """
+
+    def fetch(url):
+        started = time.perf_counter()
+        status = Client().get(url).status_code
+        latency = time.perf_counter() - started
+        connections.close_all()
+        return latency, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - started
+    return summarize(
+        [latency for latency, _ in results],
+        elapsed,
+        sum(status != 200 for _, status in results),
+    )
+
+
+async def run_asgi(urls, concurrency):
+    """
+    GET urls through the ASGI handler, concurrency requests in flight
+    """
+    client = AsyncClient()
+    limit = asyncio.Semaphore(concurrency)
+
+    async def fetch(url):
+        async with limit:
+            started = time.perf_counter()
+            response = await client.get(url)
+            return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(fetch(url) for url in urls))
+    elapsed = time.perf_counter() - started
+    return summarize(
+        [latency for latency, _ in results],
+        elapsed,
+        sum(status != 200 for _, status in results),
+    )
+
+
+class Command(BaseCommand):
+    """
+    request each dashboard page through WSGI (its sync view, from a thread
+    pool) and through ASGI (its async view, from one event loop) with the
+    same concurrency, and compare throughput and latency
+    """
+
+    help = "Compare WSGI and ASGI throughput of the voyage dashboards"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="per page")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--objects",
+            type=int,
+            default=20,
+            help="distinct faculty/students the requests cycle through",
+        )
+        parser.add_argument(
+            "--page", action="append", choices=list(PAGES), help="page to test"
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive")
+        self.stdout.write(
+            f"{'page':<22} {'mode':<5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'errors':>6}"
+        )
+        for name in options["page"] or PAGES:
+            async_name, kwarg, model = PAGES[name]
+            ids = list(
+                model.objects.order_by("id").values_list("id", flat=True)[
+                    : options["objects"]
+                ]
+            )
+            if not ids:
+                raise CommandError(f"No {model._meta.verbose_name} to request")
+            picks = [ids[index % len(ids)] for index in range(options["requests"])]
+            runs = {
+                "wsgi": run_wsgi(
+                    [reverse(name, kwargs={kwarg: pk}) for pk in picks],
+                    options["concurrency"],
+                ),
+                "asgi": asyncio.run(
+                    run_asgi(
+                        [reverse(async_name, kwargs={kwarg: pk}) for pk in picks],
+                        options["concurrency"],
+                    )
+                ),
+            }
+            for mode, result in runs.items():
+                self.stdout.write(
+                    f"{name:<22} {mode:<5} {result['rps']:>8} {result['p50_ms']:>9} "
+                    f"{result['p95_ms']:>9} {result['errors']:>6}"
+                )
@@ -0,0 +1,34 @@
+"""
+Process deadlines
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.voyage.utils.deadlines import BATCH_SIZE, process
+
+
+class Command(BaseCommand):
+    """
+    mark late and missing submissions of the assignments that fell due
+    since the last run
+    """
+
+    help = "Mark late and missing voyage submissions of newly past due assignments"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="assignments marked per transaction",
+        )
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options["verbosity"] > 1 else None
+        run = process(batch_size=options["batch_size"], log=log)
+        self.stdout.write(f"{run.assignments} assignments fell due by {run.through}")
+        for row in run.digests.select_related("program").order_by("program__name"):
+            self.stdout.write(
+                f"{row.program}: {row.assignments} assignments, {row.on_time} on "
+                f"time, {row.late} late, {row.missing} missing"
+            )
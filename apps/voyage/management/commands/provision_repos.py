@@ -0,0 +1,44 @@
+"""
+Provision student repositories
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.voyage.models import Assignment, RepoProvisioning
+from apps.voyage.tasks import provision_assignment_repos, provision_student_repos
+from apps.voyage.utils.repos import prepare
+
+
+class Command(BaseCommand):
+    """
+    clone an assignment's content repo for every student of its program,
+    through the worker, or serially in this process with --eager
+    """
+
+    help = "Provision student repositories of an assignment"
+
+    def add_arguments(self, parser):
+        parser.add_argument("assignment_id", type=int)
+        parser.add_argument(
+            "--eager", action="store_true", help="run the tasks in this process"
+        )
+
+    def handle(self, *args, **options):
+        if not Assignment.objects.filter(pk=options["assignment_id"]).exists():
+            raise CommandError(f"Assignment {options['assignment_id']} does not exist")
+        if not options["eager"]:
+            provision_assignment_repos.delay(options["assignment_id"])
+            self.stdout.write("queued")
+            return
+
+        # one local run of the clones, without touching the app's config
+        pending = prepare(Assignment.objects.get(pk=options["assignment_id"]))
+        if pending:
+            provision_student_repos.apply(args=(options["assignment_id"], pending))
+        progress = RepoProvisioning.objects.get(
+            assignment_id=options["assignment_id"]
+        ).progress()
+        self.stdout.write(
+            f"{progress['succeeded']} cloned, {progress['failed']} failed "
+            f"of {progress['total']}"
+        )
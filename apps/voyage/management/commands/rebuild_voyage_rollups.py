@@ -0,0 +1,32 @@
+"""
+Rebuild grade rollups and assignment edges
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.voyage.models import (
+    AssignmentGradeRollup,
+    CourseGradeRollup,
+    StudentGradeRollup,
+)
+from apps.voyage.utils import edges, rollups
+
+
+class Command(BaseCommand):
+    """
+    recompute student, assignment and course grade rollups and assignment
+    edges from scratch
+    """
+
+    help = (
+        "Rebuild voyage grade rollups from StudentAssignment rows and "
+        "assignment edges from Assignment rows"
+    )
+
+    def handle(self, *args, **options):
+        rollups.rebuild()
+        for model in (StudentGradeRollup, AssignmentGradeRollup, CourseGradeRollup):
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {model.objects.count()}"
+            )
+        self.stdout.write(f"assignment edges: {edges.rebuild()}")
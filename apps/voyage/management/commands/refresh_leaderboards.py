@@ -0,0 +1,26 @@
+"""
+Refresh leaderboards
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.voyage.utils.rankings import refresh_all
+
+
+class Command(BaseCommand):
+    """
+    re-rank the students of every program and course whose grades changed
+    since the last refresh
+    """
+
+    help = "Refresh the voyage program and course leaderboards"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="refresh unchanged leaderboards too"
+        )
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options["verbosity"] > 1 else None
+        refreshed = refresh_all(force=options["force"], log=log)
+        self.stdout.write(f"{refreshed} leaderboards refreshed")
@@ -0,0 +1,77 @@
+"""
+Seed voyage with synthetic data
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.voyage.utils.seed import Seeder
+
+
+class Command(BaseCommand):
+    """
+    bulk generate faculty, programs, courses, content, assignments, students
+    and submissions, e.g. --students 50000 --submissions 5000000
+    """
+
+    help = "Generate synthetic voyage data in batched bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--faculty", type=int, default=5)
+        parser.add_argument("--programs", type=int, default=3)
+        parser.add_argument("--courses", type=int, default=3)
+        parser.add_argument("--content", type=int, default=28)
+        parser.add_argument(
+            "--assignments", type=int, default=5, help="assignments per program"
+        )
+        parser.add_argument("--students", type=int, default=10)
+        parser.add_argument(
+            "--submissions", type=int, default=45, help="total StudentAssignment rows"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--seed", type=int, default=None, help="seed for reproducible data"
+        )
+        parser.add_argument(
+            "--now",
+            default=None,
+            help="ISO datetime the dates are relative to (default: a fixed "
+            "epoch with --seed, else the current time)",
+        )
+
+    def handle(self, *args, **options):
+        now = None
+        if options["now"]:
+            now = parse_datetime(options["now"])
+            if now is None:
+                raise CommandError(f"Invalid --now {options['now']!r}")
+            if timezone.is_naive(now):
+                now = timezone.make_aware(now)
+        seeder = Seeder(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            log=self.log if options["verbosity"] > 1 else None,
+            now=now,
+        )
+        started = time.perf_counter()
+        totals = seeder.run(
+            faculty=options["faculty"],
+            programs=options["programs"],
+            courses=options["courses"],
+            content=options["content"],
+            assignments=options["assignments"],
+            students=options["students"],
+            submissions=options["submissions"],
+        )
+        elapsed = time.perf_counter() - started
+        summary = ", ".join(f"{count} {name}" for name, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} in {elapsed:.1f}s"))
+
+    def log(self, message):
+        """
+        progress output
+        """
+        self.stdout.write(message)
@@ -0,0 +1,20 @@
+"""
+Snapshot grades
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.voyage.utils.history import snapshot
+
+
+class Command(BaseCommand):
+    """
+    compact the grade history into a snapshot of every assignment's graded
+    totals
+    """
+
+    help = "Take a voyage grade snapshot for point-in-time queries"
+
+    def handle(self, *args, **options):
+        snap = snapshot()
+        self.stdout.write(f"snapshot {snap} of {snap.totals.count()} assignments")
@@ -0,0 +1,40 @@
+"""
+Inspect the voyage cache
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.voyage.utils import cache
+
+
+class Command(BaseCommand):
+    """
+    print the cache generation and hit/miss counters
+    """
+
+    help = "Show voyage cache hit/miss metrics"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bump", action="store_true", help="retire every cached page"
+        )
+        parser.add_argument(
+            "--reset", action="store_true", help="zero the hit/miss counters"
+        )
+
+    def handle(self, *args, **options):
+        if not cache.shared():
+            raise CommandError(
+                "The cache backend is local to each process, so this command "
+                "only sees its own empty copy; set CACHE_TYPE=file or a shared "
+                "backend"
+            )
+        if options["bump"]:
+            cache.bump()
+        metrics = cache.metrics()
+        self.stdout.write(
+            f"generation {cache.generation()}: {metrics['hits']} hits, "
+            f"{metrics['misses']} misses, ratio {metrics['ratio']}"
+        )
+        if options["reset"]:
+            cache.reset_metrics()
@@ -0,0 +1,177 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:26
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def build_rollups(apps, schema_editor):
+    StudentAssignment = apps.get_model("voyage", "StudentAssignment")
+    for model_name, key, path in (
+        ("StudentGradeRollup", "student_id", "student_id"),
+        ("AssignmentGradeRollup", "assignment_id", "assignment_id"),
+        ("CourseGradeRollup", "course_id", "assignment__course_id"),
+    ):
+        model = apps.get_model("voyage", model_name)
+        totals = (
+            StudentAssignment.objects.order_by()
+            .values(path)
+            .annotate(
+                grade_sum=Sum("grade", default=0),
+                count=Count("id"),
+                graded_count=Count("grade"),
+                submitted_count=Count("submitted"),
+            )
+        )
+        model.objects.bulk_create(
+            [
+                model(
+                    **{key: row[path]},
+                    grade_sum=row["grade_sum"],
+                    count=row["count"],
+                    graded_count=row["graded_count"],
+                    submitted_count=row["submitted_count"],
+                )
+                for row in totals
+            ],
+            batch_size=2000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voyage", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="content",
+            options={"verbose_name": "Content", "verbose_name_plural": "Content"},
+        ),
+        migrations.AlterUniqueTogether(
+            name="assignment",
+            unique_together={("program", "course", "content")},
+        ),
+        migrations.CreateModel(
+            name="StudentGradeRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                (
+                    "grade_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("graded_count", models.PositiveIntegerField(default=0)),
+                ("submitted_count", models.PositiveIntegerField(default=0)),
+                (
+                    "student",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="grade_rollup",
+                        to="voyage.student",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="CourseGradeRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                (
+                    "grade_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("graded_count", models.PositiveIntegerField(default=0)),
+                ("submitted_count", models.PositiveIntegerField(default=0)),
+                (
+                    "course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="grade_rollup",
+                        to="voyage.course",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="AssignmentGradeRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                (
+                    "grade_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("graded_count", models.PositiveIntegerField(default=0)),
+                ("submitted_count", models.PositiveIntegerField(default=0)),
+                (
+                    "assignment",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="grade_rollup",
+                        to="voyage.assignment",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voyage", "0002_grade_rollups"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["course", "program"], name="voyage_asg_course_program"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["content", "course"], name="voyage_asg_content_course"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentassignment",
+            index=models.Index(
+                fields=["student", "assignment"], name="voyage_sa_student_assignment"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentassignment",
+            index=models.Index(
+                condition=models.Q(("submitted__isnull", False)),
+                fields=["student"],
+                name="voyage_sa_submitted",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentassignment",
+            index=models.Index(
+                condition=models.Q(("submitted__isnull", True)),
+                fields=["student"],
+                name="voyage_sa_not_submitted",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentassignment",
+            index=models.Index(
+                condition=models.Q(("grade__isnull", False)),
+                fields=["assignment"],
+                name="voyage_sa_graded",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentassignment",
+            index=models.Index(
+                condition=models.Q(("grade__isnull", True)),
+                fields=["assignment"],
+                name="voyage_sa_ungraded",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentassignment",
+            index=models.Index(
+                condition=models.Q(("grade__isnull", False)),
+                fields=["reviewer"],
+                name="voyage_sa_reviewer_graded",
+            ),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:51
+
+import os
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def rebuild_rollups(apps):
+    StudentAssignment = apps.get_model("voyage", "StudentAssignment")
+    for model_name, key, path in (
+        ("StudentGradeRollup", "student_id", "student_id"),
+        ("AssignmentGradeRollup", "assignment_id", "assignment_id"),
+        ("CourseGradeRollup", "course_id", "assignment__course_id"),
+    ):
+        model = apps.get_model("voyage", model_name)
+        model.objects.all().delete()
+        totals = (
+            StudentAssignment.objects.order_by()
+            .values(path)
+            .annotate(
+                grade_sum=Sum("grade", default=0),
+                count=Count("id"),
+                graded_count=Count("grade"),
+                submitted_count=Count("submitted"),
+            )
+        )
+        model.objects.bulk_create(
+            [
+                model(
+                    **{key: row[path]},
+                    grade_sum=row["grade_sum"],
+                    count=row["count"],
+                    graded_count=row["graded_count"],
+                    submitted_count=row["submitted_count"],
+                )
+                for row in totals
+            ],
+            batch_size=2000,
+        )
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    (student, assignment) becomes unique, but several submissions per pair
+    were allowed before. stop and list the pairs, so an operator decides;
+    with VOYAGE_REMOVE_DUPLICATE_SUBMISSIONS=true keep one row per pair
+    (graded before ungraded, submitted before not submitted, then the
+    oldest) and print every row removed
+    """
+    StudentAssignment = apps.get_model("voyage", "StudentAssignment")
+    duplicates = list(
+        StudentAssignment.objects.order_by("student_id", "assignment_id")
+        .values("student_id", "assignment_id")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    if not duplicates:
+        return
+    if os.getenv("VOYAGE_REMOVE_DUPLICATE_SUBMISSIONS", "").lower() != "true":
+        pairs = "\n".join(
+            f"  student {pair['student_id']}, assignment {pair['assignment_id']}: "
+            f"{pair['rows']} rows"
+            for pair in duplicates
+        )
+        raise RuntimeError(
+            f"{len(duplicates)} (student, assignment) pairs have more than one "
+            f"StudentAssignment:\n{pairs}\nmerge them by hand, or re-run with "
+            "VOYAGE_REMOVE_DUPLICATE_SUBMISSIONS=true to keep one row per pair"
+        )
+
+    for pair in duplicates:
+        rows = StudentAssignment.objects.filter(
+            student_id=pair["student_id"], assignment_id=pair["assignment_id"]
+        )
+        values = list(rows.values_list("id", "grade", "submitted", "feedback"))
+        keep = min(values, key=lambda row: (row[1] is None, row[2] is None, row[0]))
+        for pk, grade, submitted, feedback in values:
+            if pk != keep[0]:
+                print(
+                    f"removed StudentAssignment {pk} (student {pair['student_id']}, "
+                    f"assignment {pair['assignment_id']}, grade {grade}, "
+                    f"submitted {submitted}, feedback {feedback!r}), kept {keep[0]}"
+                )
+        rows.exclude(id=keep[0]).delete()
+    rebuild_rollups(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voyage", "0004_repo_provisioning"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="studentassignment",
+            name="voyage_sa_student_assignment",
+        ),
+        migrations.AddConstraint(
+            model_name="studentassignment",
+            constraint=models.UniqueConstraint(
+                fields=("student", "assignment"), name="voyage_sa_student_assignment"
+            ),
+        ),
+    ]
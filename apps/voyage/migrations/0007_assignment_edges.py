@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_edges(apps, schema_editor):
+    Assignment = apps.get_model("voyage", "Assignment")
+    AssignmentEdge = apps.get_model("voyage", "AssignmentEdge")
+    AssignmentEdge.objects.bulk_create(
+        [
+            AssignmentEdge(
+                assignment_id=pk,
+                faculty_id=faculty_id,
+                program_id=program_id,
+                course_id=course_id,
+                content_id=content_id,
+            )
+            for pk, faculty_id, program_id, course_id, content_id in (
+                Assignment.objects.values_list(
+                    "id", "content__faculty_id", "program_id", "course_id", "content_id"
+                )
+            )
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voyage", "0006_leaderboards"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssignmentEdge",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                (
+                    "assignment",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="edge",
+                        to="voyage.assignment",
+                    ),
+                ),
+                (
+                    "content",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="voyage.content"
+                    ),
+                ),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="voyage.course"
+                    ),
+                ),
+                (
+                    "faculty",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="voyage.faculty"
+                    ),
+                ),
+                (
+                    "program",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="voyage.program"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["faculty", "course"], name="voyage_edge_faculty_course"
+                    ),
+                    models.Index(
+                        fields=["faculty", "program"],
+                        name="voyage_edge_faculty_program",
+                    ),
+                    models.Index(
+                        fields=["program", "course"], name="voyage_edge_program_course"
+                    ),
+                    models.Index(
+                        fields=["course", "program"], name="voyage_edge_course_program"
+                    ),
+                    models.Index(
+                        fields=["content", "course"], name="voyage_edge_content_course"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(build_edges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,161 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voyage", "0007_assignment_edges"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GradeSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                ("taken", models.DateTimeField(unique=True)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="GradeSnapshotTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                (
+                    "grade_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("graded_count", models.PositiveIntegerField(default=0)),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="voyage.assignment",
+                    ),
+                ),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="totals",
+                        to="voyage.gradesnapshot",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="GradeEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                (
+                    "previous",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        default=None,
+                        max_digits=5,
+                        null=True,
+                    ),
+                ),
+                (
+                    "grade",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        default=None,
+                        max_digits=5,
+                        null=True,
+                    ),
+                ),
+                ("feedback", models.TextField(blank=True, default=None, null=True)),
+                ("recorded", models.DateTimeField()),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="voyage.assignment",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="voyage.student"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="gradesnapshottotal",
+            constraint=models.UniqueConstraint(
+                fields=("snapshot", "assignment"), name="voyage_snapshot_assignment"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gradeevent",
+            index=models.Index(fields=["recorded"], name="voyage_event_recorded"),
+        ),
+        migrations.AddIndex(
+            model_name="gradeevent",
+            index=models.Index(
+                fields=["student", "recorded"], name="voyage_event_student"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gradeevent",
+            index=models.Index(
+                fields=["assignment", "recorded"], name="voyage_event_assignment"
+            ),
+        ),
+    ]
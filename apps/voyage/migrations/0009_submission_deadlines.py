@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voyage", "0008_grade_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadlineDigest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                ("assignments", models.PositiveIntegerField(default=0)),
+                ("on_time", models.PositiveIntegerField(default=0)),
+                ("late", models.PositiveIntegerField(default=0)),
+                ("missing", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DeadlineRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dtm_created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="DTM Created"),
+                ),
+                (
+                    "dtm_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="DTM Updated"),
+                ),
+                ("through", models.DateTimeField(unique=True)),
+                ("assignments", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="studentassignment",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("open", "Open"),
+                    ("on_time", "On time"),
+                    ("late", "Late"),
+                    ("missing", "Missing"),
+                ],
+                default="open",
+                max_length=8,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentassignment",
+            index=models.Index(
+                condition=models.Q(("status", "missing")),
+                fields=["assignment"],
+                name="voyage_sa_missing",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deadlinedigest",
+            name="program",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="voyage.program"
+            ),
+        ),
+        migrations.AddField(
+            model_name="deadlinedigest",
+            name="run",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="digests",
+                to="voyage.deadlinerun",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="deadlinedigest",
+            constraint=models.UniqueConstraint(
+                fields=("run", "program"), name="voyage_digest_run_program"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voyage", "0009_submission_deadlines"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="studentassignment",
+            index=models.Index(
+                condition=models.Q(("status", "open")),
+                fields=["assignment"],
+                name="voyage_sa_open",
+            ),
+        ),
+    ]
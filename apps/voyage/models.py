@@ -5,8 +5,7 @@ Voyage Model
 from datetime import timedelta
 import random
 from django.contrib.auth import get_user_model
-from django.db import models
-# import git
+from django.db import connection, models
 from qux.models import QuxModel
 from faker import Faker
 
@@ -47,14 +46,17 @@ class Faculty(QuxModel):
         """
         returns all programs associated with this faculty.
         """
-        return Program.objects.filter(assignment__content__faculty=self).distinct()
+        return Program.objects.filter(
+            pk__in=AssignmentEdge.related("program", faculty=self)
+        )
 
     def courses(self):
         """
         returns all courses associated with programs of this faculty.
         """
-
-        return Course.objects.filter(assignment__content__faculty=self).distinct()
+        return Course.objects.filter(
+            pk__in=AssignmentEdge.related("course", faculty=self)
+        )
 
     def content(self, program=None, course=None):
         """
@@ -143,7 +145,9 @@ class Program(QuxModel):
         """
         number of courses in each program.
         """
-        return Course.objects.filter(assignment__program=self).distinct()
+        return Course.objects.filter(
+            pk__in=AssignmentEdge.related("course", program=self)
+        )
 
 
 class Course(QuxModel):
@@ -184,7 +188,9 @@ class Course(QuxModel):
         """
         returns programs associated with this course
         """
-        return Program.objects.filter(assignment__course=self)
+        return Program.objects.filter(
+            pk__in=AssignmentEdge.related("program", course=self)
+        )
 
     @property
     def students(self):
@@ -212,6 +218,15 @@ class Course(QuxModel):
         """
         return StudentAssignment.objects.filter(assignment__course=self).distinct()
 
+    def avg_grade(self):
+        """
+        average grade of all assignments in this course.
+        """
+        try:
+            return self.grade_rollup.average()
+        except CourseGradeRollup.DoesNotExist:
+            return None
+
 
 class Content(QuxModel):
     """
@@ -251,7 +266,9 @@ class Content(QuxModel):
         """
         return number of courses
         """
-        return Course.objects.filter(assignment__content=self).distinct()
+        return Course.objects.filter(
+            pk__in=AssignmentEdge.related("course", content=self)
+        )
 
     def assignments(self):
         """
@@ -299,14 +316,16 @@ class Student(QuxModel):
         """
         return courses associated with this student's program
         """
-        return Course.objects.filter(assignment__program__student=self).distinct()
+        return Course.objects.filter(
+            pk__in=AssignmentEdge.related("course", program_id=self.program_id)
+        )
 
     def assignments(self):
         """
-        return assignments
+        return assignments, as a lazy queryset; a student has one row per
+        assignment, so the join needs no distinct
         """
-        studentassignments = self.studentassignment_set.all().distinct()
-        return [assignment.assignment for assignment in studentassignments]
+        return Assignment.objects.filter(studentassignment__student=self)
 
     def assignments_submitted(self, assignment=None):
         """
@@ -328,6 +347,18 @@ class Student(QuxModel):
             )
         return self.studentassignment_set.filter(submitted__isnull=True)
 
+    def assignments_late(self):
+        """
+        returns past due assignments submitted after their due date
+        """
+        return self.studentassignment_set.filter(status=StudentAssignment.LATE)
+
+    def assignments_missing(self):
+        """
+        returns past due assignments not submitted
+        """
+        return self.studentassignment_set.filter(status=StudentAssignment.MISSING)
+
     def assignments_graded(self, assignment=None):
         """
         returns graded assignments
@@ -344,39 +375,38 @@ class Student(QuxModel):
         """
         average grade of each student.
         """
-        submitted_assignments = self.studentassignment_set.filter(
-            submitted__isnull=False
-        )
-        total_assignments = self.studentassignment_set.all().count()
-        total_grade = sum(assignment.grade for assignment in submitted_assignments)
-        return round(total_grade / total_assignments, 2)
+        try:
+            return self.grade_rollup.average()
+        except StudentGradeRollup.DoesNotExist:
+            return None
 
     def get_grade(self, assignments):
         """
         return the grade of all the assignments of a student
         """
-        assignment_grade = {}
-        for assignment in assignments:
-            assignmentgrade = StudentAssignment.objects.filter(
-                student=self, assignment=assignment
-            )
-            total_grade = sum(assignment.grade for assignment in assignmentgrade)
-            assignment_grade[assignment] = round(total_grade / len(assignmentgrade), 2)
-        return assignment_grade
+        # pylint: disable=import-outside-toplevel
+        from .utils.gradebook import Gradebook
+
+        gradebook = Gradebook.for_students([self.pk], assignments)
+        return {
+            assignment: gradebook.average(self.pk, assignment.pk)
+            for assignment in assignments
+        }
 
     def find_total_submissions(self, assignments):
         """
         return the total number of submissions of each assignment
         """
-        submitted_assignments = {}
-        for assignment in assignments:
-            total_submissions = len(
-                StudentAssignment.objects.filter(
-                    assignment=assignment.assignment, student=self
-                )
+        # pylint: disable=import-outside-toplevel
+        from .utils.gradebook import Gradebook
+
+        gradebook = Gradebook.for_students([self.pk])
+        return {
+            assignment.assignment: gradebook.submissions(
+                self.pk, assignment.assignment_id
             )
-            submitted_assignments[assignment.assignment] = total_submissions
-        return submitted_assignments
+            for assignment in assignments
+        }
 
 
 class Assignment(QuxModel):
@@ -397,6 +427,15 @@ class Assignment(QuxModel):
         """
 
         unique_together = ["program", "course", "content"]
+        indexes = [
+            # (program, course, ...) is covered by unique_together
+            models.Index(
+                fields=["course", "program"], name="voyage_asg_course_program"
+            ),
+            models.Index(
+                fields=["content", "course"], name="voyage_asg_content_course"
+            ),
+        ]
 
     @classmethod
     def generate_random_data(cls):
@@ -434,7 +473,7 @@ class Assignment(QuxModel):
         """
         return students
         """
-        Student.objects.filter(studentassignment__assignment=self).distinct()
+        return Student.objects.filter(studentassignment__assignment=self)
 
     def submissions(self, graded=None):
         """
@@ -450,24 +489,64 @@ class Assignment(QuxModel):
         """
         average grade of each assignment.
         """
-        submissions = self.studentassignment_set.filter(grade__isnull=False)
-        assignments = self.studentassignment_set.all().count()
-        total_grade = sum(submission.grade for submission in submissions)
-        return round(total_grade / assignments, 2)
+        try:
+            return self.grade_rollup.average()
+        except AssignmentGradeRollup.DoesNotExist:
+            return None
 
-    # def repo_for_student(self, course_repo_url, student_username):
-    #     repo = git.Repo.clone_from(
-    #         course_repo_url,
-    #         f"https://github.com/{student_username}/{self.content.name}",
-    #     )
-    #     return repo
 
-    # def save(self, **kwargs):
-    #     students = Student.objects.all()
-    #     for student in students:
-    #         self.repo_for_student(self.content.repo, student.user.username)
+class AssignmentEdge(QuxModel):
+    """
+    The faculty, program, course and content an Assignment connects, with
+    the faculty of its content copied in; kept in step with Assignment and
+    Content by signals, so relationship lookups scan one indexed table
+    """
 
-    #     return super().save(**kwargs)
+    assignment = models.OneToOneField(
+        Assignment, on_delete=models.CASCADE, related_name="edge"
+    )
+    faculty = models.ForeignKey(Faculty, on_delete=models.CASCADE)
+    program = models.ForeignKey(Program, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    content = models.ForeignKey(Content, on_delete=models.CASCADE)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        indexes = [
+            models.Index(
+                fields=["faculty", "course"], name="voyage_edge_faculty_course"
+            ),
+            models.Index(
+                fields=["faculty", "program"], name="voyage_edge_faculty_program"
+            ),
+            models.Index(
+                fields=["program", "course"], name="voyage_edge_program_course"
+            ),
+            models.Index(
+                fields=["course", "program"], name="voyage_edge_course_program"
+            ),
+            models.Index(
+                fields=["content", "course"], name="voyage_edge_content_course"
+            ),
+        ]
+
+    def __str__(self):
+        """
+        display
+        """
+        return f"{self.program} - {self.course} - {self.content}"
+
+    @classmethod
+    def related(cls, field, **filters):
+        """
+        ids of field on the edges matching filters, as a subquery; filtering
+        with pk__in=related(...) is a semi-join, so nothing is multiplied
+        and no DISTINCT is needed
+        """
+        return cls.objects.filter(**filters).values(field)
 
 
 class StudentAssignment(QuxModel):
@@ -475,6 +554,18 @@ class StudentAssignment(QuxModel):
     StudentAssignment Model
     """
 
+    # status is set once the assignment is past due, by the deadline task
+    OPEN = "open"
+    ON_TIME = "on_time"
+    LATE = "late"
+    MISSING = "missing"
+    STATUS_CHOICES = [
+        (OPEN, "Open"),
+        (ON_TIME, "On time"),
+        (LATE, "Late"),
+        (MISSING, "Missing"),
+    ]
+
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
     grade = models.DecimalField(
@@ -490,6 +581,58 @@ class StudentAssignment(QuxModel):
         Faculty, on_delete=models.DO_NOTHING, default=None, null=True, blank=True
     )
     feedback = models.TextField(default=None, null=True, blank=True)
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=OPEN)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        constraints = [
+            # also serves (student) and (student, assignment) lookups
+            models.UniqueConstraint(
+                fields=["student", "assignment"], name="voyage_sa_student_assignment"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["student"],
+                condition=models.Q(submitted__isnull=False),
+                name="voyage_sa_submitted",
+            ),
+            models.Index(
+                fields=["student"],
+                condition=models.Q(submitted__isnull=True),
+                name="voyage_sa_not_submitted",
+            ),
+            models.Index(
+                fields=["assignment"],
+                condition=models.Q(grade__isnull=False),
+                name="voyage_sa_graded",
+            ),
+            models.Index(
+                fields=["assignment"],
+                condition=models.Q(grade__isnull=True),
+                name="voyage_sa_ungraded",
+            ),
+            models.Index(
+                fields=["reviewer"],
+                condition=models.Q(grade__isnull=False),
+                name="voyage_sa_reviewer_graded",
+            ),
+            # missing rows are re-checked for late submissions on every run
+            models.Index(
+                fields=["assignment"],
+                condition=models.Q(status="missing"),
+                name="voyage_sa_missing",
+            ),
+            # open rows of past due assignments are swept up on every run
+            models.Index(
+                fields=["assignment"],
+                condition=models.Q(status="open"),
+                name="voyage_sa_open",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -507,7 +650,7 @@ class StudentAssignment(QuxModel):
         assignments = Assignment.objects.all()
         faculties = Faculty.objects.all()
 
-        student_assignments = []
+        student_assignments = {}
         for _ in range(45):
             student = random.choice(students)
             assignment = random.choice(assignments)
@@ -526,5 +669,371 @@ class StudentAssignment(QuxModel):
                 reviewer=reviewer,
                 feedback=feedback,
             )
-            student_assignments.append(student_assignment)
-        StudentAssignment.objects.bulk_create(student_assignments)
+            student_assignments[(student.pk, assignment.pk)] = student_assignment
+        # rows already exist for the students of every assignment, so
+        # overwrite them
+        StudentAssignment.objects.bulk_create(
+            student_assignments.values(),
+            update_conflicts=True,
+            unique_fields=(
+                ["student", "assignment"]
+                if connection.features.supports_update_conflicts_with_target
+                else None
+            ),
+            update_fields=["grade", "submitted", "reviewed", "reviewer", "feedback"],
+        )
+
+        # pylint: disable=import-outside-toplevel
+        from .utils import rollups
+
+        rollups.rebuild()
+
+
+class GradeRollup(QuxModel):
+    """
+    Running grade and submission totals over StudentAssignment rows
+    """
+
+    grade_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+    graded_count = models.PositiveIntegerField(default=0)
+    submitted_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        abstract = True
+
+    def average(self):
+        """
+        average grade over all rows, ungraded rows counting as zero
+        """
+        if not self.count:
+            return None
+        return round(self.grade_sum / self.count, 2)
+
+
+class StudentGradeRollup(GradeRollup):
+    """
+    Grade totals per student
+    """
+
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, related_name="grade_rollup"
+    )
+
+
+class AssignmentGradeRollup(GradeRollup):
+    """
+    Grade totals per assignment
+    """
+
+    assignment = models.OneToOneField(
+        Assignment, on_delete=models.CASCADE, related_name="grade_rollup"
+    )
+
+
+class CourseGradeRollup(GradeRollup):
+    """
+    Grade totals per course
+    """
+
+    course = models.OneToOneField(
+        Course, on_delete=models.CASCADE, related_name="grade_rollup"
+    )
+
+
+class RepoProvisioning(QuxModel):
+    """
+    Progress of cloning an assignment's content repo for its students
+    """
+
+    assignment = models.OneToOneField(
+        Assignment, on_delete=models.CASCADE, related_name="provisioning"
+    )
+    total = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        """
+        display
+        """
+        return f"{self.assignment}: {self.succeeded + self.failed}/{self.total}"
+
+    def progress(self):
+        """
+        counts and completion as a dict
+        """
+        pending = max(self.total - self.succeeded - self.failed, 0)
+        return {
+            "assignment": self.assignment_id,
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "pending": pending,
+            "done": pending == 0,
+        }
+
+
+class StudentRepo(QuxModel):
+    """
+    A student's clone of an assignment's content repo.
+
+    (assignment, student) is the idempotency key of the provisioning task:
+    a row is created once and a repo that is already cloned is skipped.
+    """
+
+    PENDING = "pending"
+    CLONED = "cloned"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (CLONED, "Cloned"), (FAILED, "Failed")]
+
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    path = models.CharField(max_length=255, default=None, null=True, blank=True)
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(default=None, null=True, blank=True)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["assignment", "student"], name="voyage_repo_assignment_student"
+            ),
+        ]
+
+    def __str__(self):
+        """
+        display
+        """
+        return f"{self.student} - {self.assignment}: {self.status}"
+
+
+class Leaderboard(QuxModel):
+    """
+    Ranked standings of the students of a program or of a course, as of
+    its last refresh
+    """
+
+    program = models.OneToOneField(
+        Program,
+        on_delete=models.CASCADE,
+        default=None,
+        null=True,
+        blank=True,
+        related_name="leaderboard",
+    )
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.CASCADE,
+        default=None,
+        null=True,
+        blank=True,
+        related_name="leaderboard",
+    )
+    # state of the ranked StudentAssignment rows when last refreshed
+    fingerprint = models.CharField(max_length=128, default="", blank=True)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(program__isnull=False, course__isnull=True)
+                | models.Q(program__isnull=True, course__isnull=False),
+                name="voyage_leaderboard_one_scope",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        display
+        """
+        return f"{self.program or self.course} leaderboard"
+
+    def top(self, count=10):
+        """
+        the count best ranked entries
+        """
+        return self.entries.select_related("student__user").order_by(
+            "rank", "student_id"
+        )[:count]
+
+    def rank_of(self, student):
+        """
+        entry of student, or None if the student is not ranked
+        """
+        return (
+            self.entries.select_related("student__user").filter(student=student).first()
+        )
+
+
+class LeaderboardEntry(QuxModel):
+    """
+    A student's average and dense rank on a leaderboard
+    """
+
+    leaderboard = models.ForeignKey(
+        Leaderboard, on_delete=models.CASCADE, related_name="entries"
+    )
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    average = models.DecimalField(max_digits=5, decimal_places=2)
+    rank = models.PositiveIntegerField()
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["leaderboard", "student"], name="voyage_leaderboard_student"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["leaderboard", "rank"], name="voyage_leaderboard_rank"
+            ),
+        ]
+
+    def __str__(self):
+        """
+        display
+        """
+        return f"{self.rank}. {self.student.user} ({self.average})"
+
+
+class GradeEvent(QuxModel):
+    """
+    A change to the grade or feedback of a StudentAssignment; only ever
+    appended, in bulk by the paths that write grades
+    """
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
+    previous = models.DecimalField(
+        max_digits=5, decimal_places=2, default=None, null=True, blank=True
+    )
+    grade = models.DecimalField(
+        max_digits=5, decimal_places=2, default=None, null=True, blank=True
+    )
+    feedback = models.TextField(default=None, null=True, blank=True)
+    recorded = models.DateTimeField()
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        indexes = [
+            models.Index(fields=["recorded"], name="voyage_event_recorded"),
+            models.Index(fields=["student", "recorded"], name="voyage_event_student"),
+            models.Index(
+                fields=["assignment", "recorded"], name="voyage_event_assignment"
+            ),
+        ]
+
+    def __str__(self):
+        """
+        display
+        """
+        return (
+            f"{self.student_id} - {self.assignment_id}: {self.previous} -> {self.grade}"
+        )
+
+
+class GradeSnapshot(QuxModel):
+    """
+    Graded totals of every assignment as of taken, so point-in-time
+    queries replay only the GradeEvents recorded after it
+    """
+
+    taken = models.DateTimeField(unique=True)
+
+    def __str__(self):
+        """
+        display
+        """
+        return f"{self.taken:%Y-%m-%d %H:%M}"
+
+
+class GradeSnapshotTotal(QuxModel):
+    """
+    Sum and count of an assignment's grades in a GradeSnapshot
+    """
+
+    snapshot = models.ForeignKey(
+        GradeSnapshot, on_delete=models.CASCADE, related_name="totals"
+    )
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
+    grade_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    graded_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["snapshot", "assignment"], name="voyage_snapshot_assignment"
+            ),
+        ]
+
+
+class DeadlineRun(QuxModel):
+    """
+    A run of the deadline task; through is its watermark: assignments due
+    by then have their late and missing statuses set
+    """
+
+    through = models.DateTimeField(unique=True)
+    assignments = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        """
+        display
+        """
+        return f"{self.through:%Y-%m-%d %H:%M}: {self.assignments} assignments"
+
+
+class DeadlineDigest(QuxModel):
+    """
+    Statuses of a program's submissions to the assignments that fell due
+    in a DeadlineRun
+    """
+
+    run = models.ForeignKey(
+        DeadlineRun, on_delete=models.CASCADE, related_name="digests"
+    )
+    program = models.ForeignKey(Program, on_delete=models.CASCADE)
+    assignments = models.PositiveIntegerField(default=0)
+    on_time = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    missing = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "program"], name="voyage_digest_run_program"
+            ),
+        ]
+
+    def __str__(self):
+        """
+        display
+        """
+        return f"{self.program} {self.run}"
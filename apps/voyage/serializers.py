@@ -0,0 +1,157 @@
+"""
+Serializers
+"""
+
+from rest_framework import serializers
+
+from .models import (
+    Assignment,
+    Content,
+    Course,
+    Program,
+    Student,
+    StudentAssignment,
+)
+
+
+class SparseFieldsMixin:
+    """
+    keep only the fields named in ?fields=a,b of the request
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or not request.query_params.get("fields"):
+            return
+        wanted = set(request.query_params["fields"].split(","))
+        for name in set(self.fields) - wanted:
+            self.fields.pop(name)
+
+
+class ProgramSummarySerializer(serializers.ModelSerializer):
+    """
+    program nested in other resources
+    """
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        model = Program
+        fields = ["id", "name"]
+
+
+class ContentSummarySerializer(serializers.ModelSerializer):
+    """
+    content nested in assignments
+    """
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        model = Content
+        fields = ["id", "name", "repo"]
+
+
+class ProgramSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Program
+    """
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        model = Program
+        fields = ["id", "name", "start", "end", "dtm_created", "dtm_updated"]
+
+
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Course with the ids of its assignments
+    """
+
+    assignments = serializers.PrimaryKeyRelatedField(
+        source="assignment_set", many=True, read_only=True
+    )
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        model = Course
+        fields = ["id", "name", "assignments", "dtm_created", "dtm_updated"]
+
+
+class StudentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Student
+    """
+
+    program = ProgramSummarySerializer(read_only=True)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        model = Student
+        fields = ["id", "github", "is_active", "program", "dtm_created", "dtm_updated"]
+
+
+class AssignmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Assignment
+    """
+
+    content = ContentSummarySerializer(read_only=True)
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        model = Assignment
+        fields = [
+            "id",
+            "program",
+            "course",
+            "content",
+            "due",
+            "instructions",
+            "rubric",
+            "dtm_created",
+            "dtm_updated",
+        ]
+
+
+class SubmissionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    StudentAssignment
+    """
+
+    class Meta:
+        """
+        Meta class
+        """
+
+        model = StudentAssignment
+        fields = [
+            "id",
+            "student",
+            "assignment",
+            "grade",
+            "submitted",
+            "reviewed",
+            "reviewer",
+            "feedback",
+            "status",
+            "dtm_created",
+            "dtm_updated",
+        ]
@@ -0,0 +1,202 @@
+"""
+Voyage signals
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import (
+    Assignment,
+    Content,
+    Course,
+    Faculty,
+    Program,
+    Student,
+    StudentAssignment,
+)
+from .utils import cache, deadlines, edges, history, rollups
+from .utils.materialize import materialize_assignment
+
+# models whose saves and deletes change what the cached pages show; the
+# grade rollups are derived from StudentAssignment and left out
+CACHED_MODELS = (
+    Faculty,
+    Program,
+    Course,
+    Content,
+    Student,
+    Assignment,
+    StudentAssignment,
+)
+
+
+def rollup_state(student_id, assignment_id, grade, submitted, course_id=None):
+    """
+    (student, assignment, course, grade, submitted) tuple used by rollups
+    """
+    if course_id is None:
+        course_id = (
+            Assignment.objects.filter(pk=assignment_id)
+            .values_list("course_id", flat=True)
+            .first()
+        )
+    return (student_id, assignment_id, course_id, grade, submitted)
+
+
+@receiver(pre_save, sender=StudentAssignment)
+def remember_previous_grade(sender, instance, raw, **kwargs):
+    """
+    stash the stored state of a StudentAssignment before it is overwritten
+    """
+    instance._rollup_previous = None
+    instance._history_previous = (None, None)
+    if raw or instance._state.adding:
+        return
+    previous = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(
+            "student_id",
+            "assignment_id",
+            "assignment__course_id",
+            "grade",
+            "submitted",
+            "feedback",
+        )
+        .first()
+    )
+    if previous is not None:
+        instance._rollup_previous = previous[:5]
+        instance._history_previous = (previous[3], previous[5])
+
+
+@receiver(post_save, sender=StudentAssignment)
+def update_rollups_on_save(sender, instance, raw, **kwargs):
+    """
+    move the row's contribution from its previous state to its current one
+    """
+    if raw:
+        return
+    previous = getattr(instance, "_rollup_previous", None)
+    course_id = None
+    if previous and previous[1] == instance.assignment_id:
+        course_id = previous[2]
+    current = rollup_state(
+        instance.student_id,
+        instance.assignment_id,
+        instance.grade,
+        instance.submitted,
+        course_id=course_id,
+    )
+    rollups.apply(previous, current)
+
+
+@receiver(post_save, sender=StudentAssignment)
+def record_grade_event(sender, instance, raw, **kwargs):
+    """
+    append a GradeEvent when the grade or feedback changed
+    """
+    if raw:
+        return
+    previous = getattr(instance, "_history_previous", (None, None))
+    if previous != (instance.grade, instance.feedback):
+        history.record(
+            [
+                (
+                    instance.student_id,
+                    instance.assignment_id,
+                    previous[0],
+                    instance.grade,
+                    instance.feedback,
+                )
+            ]
+        )
+
+
+@receiver(post_delete, sender=StudentAssignment)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    """
+    remove the row's contribution
+    """
+    previous = rollup_state(
+        instance.student_id, instance.assignment_id, instance.grade, instance.submitted
+    )
+    rollups.apply(previous, None)
+
+
+@receiver(pre_save, sender=Assignment)
+def remember_previous_course(sender, instance, raw, **kwargs):
+    """
+    stash the stored course and due date of an Assignment before they are
+    overwritten
+    """
+    instance._rollup_course_id = None
+    instance._previous_due = None
+    if raw or instance._state.adding:
+        return
+    previous = (
+        sender.objects.filter(pk=instance.pk).values_list("course_id", "due").first()
+    )
+    if previous is not None:
+        instance._rollup_course_id, instance._previous_due = previous
+
+
+@receiver(post_save, sender=Assignment)
+def create_student_assignments(sender, instance, created, raw, **kwargs):
+    """
+    a StudentAssignment for every student of a new assignment's program
+    """
+    if created and not raw:
+        materialize_assignment(instance)
+
+
+@receiver(post_save, sender=Assignment)
+def sync_assignment_edge(sender, instance, raw, **kwargs):
+    """
+    keep the assignment's edge in step with it; deletes cascade
+    """
+    if not raw:
+        edges.sync(instance)
+
+
+@receiver(post_save, sender=Assignment)
+def reschedule_deadline(sender, instance, created, raw, **kwargs):
+    """
+    statuses of a new or moved due date; one already behind the deadline
+    watermark would never be picked up by the deadline task
+    """
+    if raw:
+        return
+    if created or getattr(instance, "_previous_due", None) != instance.due:
+        deadlines.reschedule(instance)
+
+
+@receiver(post_save, sender=Content)
+def move_content_edges(sender, instance, created, raw, **kwargs):
+    """
+    content handed to another faculty takes its edges with it
+    """
+    if not (raw or created):
+        edges.move_content(instance)
+
+
+@receiver(post_save, sender=Assignment)
+def rebuild_course_rollups(sender, instance, raw, **kwargs):
+    """
+    an assignment moved to another course takes its rows with it
+    """
+    previous = getattr(instance, "_rollup_course_id", None)
+    if raw or previous is None or previous == instance.course_id:
+        return
+    rollups.rebuild(courses=[previous, instance.course_id])
+
+
+def bump_cache_generation(sender, **kwargs):
+    """
+    retire cached pages built from the previous state
+    """
+    cache.bump()
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_cache_generation, sender=model)
+    post_delete.connect(bump_cache_generation, sender=model)
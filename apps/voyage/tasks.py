@@ -0,0 +1,105 @@
+"""
+Voyage tasks
+"""
+
+from celery import group, shared_task
+from django.conf import settings
+from django.db.models import F
+
+from .models import Assignment, RepoProvisioning, StudentRepo
+from .utils import deadlines, history, rankings
+from .utils.repos import CloneError, clone, prepare, source_url, student_repo_path
+
+
+@shared_task
+def provision_assignment_repos(assignment_id):
+    """
+    create a pending StudentRepo for every student of the assignment's
+    program and fan the clones out to at most VOYAGE_PROVISION_CONCURRENCY
+    provision_student_repos tasks.
+
+    running it again only picks up repos that are not cloned yet.
+    """
+    pending = prepare(Assignment.objects.get(pk=assignment_id))
+    if not pending:
+        return 0
+    # every stripe is cloned serially by one task, which bounds the number
+    # of concurrent clones per assignment
+    stripes = max(1, settings.VOYAGE_PROVISION_CONCURRENCY)
+    group(
+        provision_student_repos.s(assignment_id, pending[index::stripes])
+        for index in range(min(stripes, len(pending)))
+    ).apply_async()
+    return len(pending)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def provision_student_repos(self, assignment_id, student_ids):
+    """
+    clone the assignment's content repo for each student, retrying the
+    failed clones with backoff and recording progress
+    """
+    assignment = Assignment.objects.select_related("content").get(pk=assignment_id)
+    source = source_url(assignment.content.repo)
+    repos = StudentRepo.objects.filter(
+        assignment=assignment, student_id__in=student_ids
+    ).select_related("student")
+    final = self.request.retries >= self.max_retries
+
+    failed = []
+    for repo in repos:
+        if repo.status == StudentRepo.CLONED:
+            # already done by an earlier delivery of this task
+            continue
+        repo.attempts += 1
+        try:
+            repo.path = clone(source, student_repo_path(repo.student, assignment))
+        except CloneError as exc:
+            repo.error = str(exc)
+            failed.append(repo.student_id)
+            if final:
+                repo.status = StudentRepo.FAILED
+        else:
+            repo.status = StudentRepo.CLONED
+            repo.error = None
+        repo.save(update_fields=["path", "status", "attempts", "error", "dtm_updated"])
+        if repo.status != StudentRepo.PENDING:
+            counter = "succeeded" if repo.status == StudentRepo.CLONED else "failed"
+            RepoProvisioning.objects.filter(assignment=assignment).update(
+                **{counter: F(counter) + 1}
+            )
+
+    if failed and not final:
+        raise self.retry(
+            args=(assignment_id, failed),
+            countdown=self.default_retry_delay * 2**self.request.retries,
+        )
+    return len(student_ids) - len(failed)
+
+
+@shared_task
+def refresh_leaderboards():
+    """
+    re-rank the programs and courses whose grades changed since the last
+    refresh; meant to run periodically
+    """
+    return rankings.refresh_all()
+
+
+@shared_task
+def snapshot_grades():
+    """
+    compact the grade history into a new snapshot, so point-in-time
+    queries replay at most one period of events; meant to run periodically
+    """
+    return history.snapshot().pk
+
+
+@shared_task
+def process_deadlines():
+    """
+    mark late and missing submissions of the assignments that fell due
+    since the last run and digest them per program; meant to run
+    periodically
+    """
+    return deadlines.process().assignments
@@ -0,0 +1,644 @@
+"""
+Voyage tests
+"""
+
+from datetime import timedelta
+from importlib.util import find_spec
+from io import BytesIO
+import os
+import re
+import subprocess
+import tempfile
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from project.routers import ReplicaRouter, replica_reads
+
+from .checks import check_shared_cache
+from .models import (
+    Assignment,
+    AssignmentGradeRollup,
+    Content,
+    Course,
+    CourseGradeRollup,
+    Faculty,
+    GradeEvent,
+    Program,
+    RepoProvisioning,
+    Student,
+    StudentAssignment,
+    StudentGradeRollup,
+    StudentRepo,
+)
+from .tasks import provision_assignment_repos
+from .utils import cache, deadlines, history, rollups
+from .utils.importer import GradebookImport
+from .utils.materialize import insert_rows, materialize_assignment
+from .utils.plans import hot_queries, uses_index
+from .utils.seed import EPOCH, Seeder
+
+
+def cohort():
+    """
+    (faculty, student, assignment) of a one student program
+    """
+    now = timezone.now()
+    program = Program.objects.create(
+        name="Cohort-1", start=now, end=now + timedelta(days=90)
+    )
+    faculty = Faculty.objects.create(
+        user=get_user_model().objects.create_user("faculty-1"), github="faculty-1"
+    )
+    student = Student.objects.create(
+        user=get_user_model().objects.create_user("student-1"),
+        github="student-1",
+        program=program,
+    )
+    assignment = Assignment.objects.create(
+        program=program,
+        course=Course.objects.create(name="Course-1"),
+        content=Content.objects.create(
+            name="Content-1",
+            faculty=faculty,
+            repo="https://github.com/example/content-1",
+        ),
+        due=now + timedelta(days=7),
+        instructions="",
+        rubric="",
+    )
+    return faculty, student, assignment
+
+
+class GradebookImportViewTests(TestCase):
+    """
+    GradebookImportView permissions
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        program = Program.objects.create(
+            name="Cohort-1", start=now, end=now + timedelta(days=90)
+        )
+        cls.student_user = get_user_model().objects.create_user("student-1")
+        Student.objects.create(
+            user=cls.student_user, github="student-1", program=program
+        )
+        cls.grader = get_user_model().objects.create_user("grader")
+        cls.grader.user_permissions.add(
+            Permission.objects.get(codename="change_studentassignment")
+        )
+
+    def test_student_is_forbidden(self):
+        """
+        a logged in user without change_studentassignment gets a 403 on
+        both the form and the upload
+        """
+        self.client.force_login(self.student_user)
+        url = reverse("import_gradebook")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+    def test_grader_is_allowed(self):
+        """
+        change_studentassignment opens the form
+        """
+        self.client.force_login(self.grader)
+        self.assertEqual(self.client.get(reverse("import_gradebook")).status_code, 200)
+
+
+class GradebookImportTests(TestCase):
+    """
+    GradebookImport optional columns
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty, cls.student, cls.assignment = cohort()
+
+    def setUp(self):
+        self.submission, _ = StudentAssignment.objects.update_or_create(
+            student=self.student,
+            assignment=self.assignment,
+            defaults={"grade": 80, "feedback": "good", "reviewer": self.faculty},
+        )
+        GradeEvent.objects.all().delete()
+
+    def test_grades_only_keeps_feedback_and_reviewer(self):
+        """
+        a file without feedback and reviewer columns leaves them as stored
+        """
+        result = GradebookImport().run(
+            ["student,assignment_id,grade", f"student-1,{self.assignment.id},90"]
+        )
+        self.assertEqual((result.updated, result.errors), (1, []))
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.grade, 90)
+        self.assertEqual(self.submission.feedback, "good")
+        self.assertEqual(self.submission.reviewer, self.faculty)
+        event = GradeEvent.objects.get()
+        self.assertEqual((event.previous, event.grade), (80, 90))
+        self.assertEqual(event.feedback, "good")
+
+    def test_unchanged_grade_records_no_event(self):
+        """
+        re-importing the stored grade without feedback is not a change
+        """
+        result = GradebookImport().run(
+            ["student,assignment_id,grade", f"student-1,{self.assignment.id},80"]
+        )
+        self.assertEqual((result.updated, result.unchanged), (0, 1))
+        self.assertFalse(GradeEvent.objects.exists())
+
+    def test_blank_feedback_column_clears_it(self):
+        """
+        a present but blank feedback cell still clears the feedback
+        """
+        GradebookImport().run(
+            [
+                "student,assignment_id,grade,feedback",
+                f"student-1,{self.assignment.id},80,",
+            ]
+        )
+        self.submission.refresh_from_db()
+        self.assertIsNone(self.submission.feedback)
+        self.assertEqual(self.submission.reviewer, self.faculty)
+
+
+class GradebookExportViewTests(TestCase):
+    """
+    GradebookExportView permissions and parquet format
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty, cls.student, cls.assignment = cohort()
+        cls.faculty.user.user_permissions.add(
+            Permission.objects.get(codename="change_studentassignment")
+        )
+        StudentAssignment.objects.update_or_create(
+            student=cls.student, assignment=cls.assignment, defaults={"grade": 80}
+        )
+
+    def setUp(self):
+        self.client.force_login(self.faculty.user)
+        self.url = f"{reverse('export_gradebook')}?format=parquet"
+
+    def test_student_is_forbidden(self):
+        """
+        a logged in user without change_studentassignment gets a 403 in
+        either format
+        """
+        self.client.force_login(self.student.user)
+        url = reverse("export_gradebook")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    @skipUnless(find_spec("pyarrow"), "pyarrow is not installed")
+    def test_parquet(self):
+        """
+        the gradebook as a parquet file
+        """
+        import pyarrow.parquet as pq
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/vnd.apache.parquet")
+        table = pq.read_table(BytesIO(b"".join(response.streaming_content)))
+        rows = table.to_pylist()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["student"], "student-1")
+        self.assertEqual(rows[0]["assignment_id"], self.assignment.id)
+
+    def test_parquet_without_pyarrow(self):
+        """
+        a 501 with the reason instead of a server error
+        """
+        with patch(
+            "apps.voyage.views.appviews.write_parquet",
+            side_effect=ImproperlyConfigured("Parquet export requires pyarrow"),
+        ):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(response.content, b"Parquet export requires pyarrow")
+
+
+class MaterializeAssignmentTests(TestCase):
+    """
+    materialize_assignment rows and rollups
+    """
+
+    def totals(self):
+        """
+        every rollup's totals
+        """
+        return [
+            sorted(
+                model.objects.values_list(
+                    f"{key}_id", "grade_sum", "count", "graded_count", "submitted_count"
+                )
+            )
+            for model, key in (
+                (StudentGradeRollup, "student"),
+                (AssignmentGradeRollup, "assignment"),
+                (CourseGradeRollup, "course"),
+            )
+        ]
+
+    def test_rollups_match_a_rebuild(self):
+        """
+        the bumped counts equal the rollups rebuilt from the rows, in chunks
+        smaller than the program
+        """
+        faculty, student, assignment = cohort()
+        StudentAssignment.objects.filter(student=student).update(grade=70)
+        rollups.rebuild()
+        for number in range(2, 6):
+            Student.objects.create(
+                user=get_user_model().objects.create_user(f"student-{number}"),
+                github=f"student-{number}",
+                program=student.program,
+            )
+        new = Assignment(
+            program=student.program,
+            course=assignment.course,
+            content=Content.objects.create(
+                name="Content-2",
+                faculty=faculty,
+                repo="https://github.com/example/content-2",
+            ),
+            due=assignment.due,
+            instructions="",
+            rubric="",
+        )
+        # the rows are created below rather than by the post_save signal
+        Assignment.objects.bulk_create([new])
+
+        self.assertEqual(materialize_assignment(new, batch_size=2), 5)
+        self.assertEqual(StudentAssignment.objects.filter(assignment=new).count(), 5)
+        bumped = self.totals()
+        rollups.rebuild()
+        self.assertEqual(bumped, self.totals())
+
+    def test_concurrent_insert_is_not_counted(self):
+        """
+        a pair another transaction inserted first is skipped and left out of
+        the pairs reported as inserted
+        """
+        faculty, student, assignment = cohort()
+        other = Student.objects.create(
+            user=get_user_model().objects.create_user("student-2"),
+            github="student-2",
+            program=student.program,
+        )
+        StudentAssignment.objects.filter(student=other).delete()
+        pairs = [(student.pk, assignment.pk), (other.pk, assignment.pk)]
+        self.assertEqual(insert_rows(pairs, batch_size=10), [(other.pk, assignment.pk)])
+        self.assertEqual(
+            StudentAssignment.objects.filter(assignment=assignment).count(), 2
+        )
+
+
+@patch("project.routers.replica_configured", return_value=True)
+class ReplicaRouterTests(SimpleTestCase):
+    """
+    ReplicaRouter read routing
+    """
+
+    def test_replica_reads(self, configured):
+        """
+        voyage reads go to the replica inside replica_reads() only
+        """
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Student))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Student), "replica")
+            self.assertIsNone(router.db_for_read(get_user_model()))
+
+    @override_settings(VOYAGE_CACHE_TIMEOUT=3600, VOYAGE_REPLICA_CACHE_TIMEOUT=60)
+    def test_cache_fill_timeout(self, configured):
+        """
+        a value computed on the replica is cached for the short timeout
+        """
+        with patch.object(cache.cache, "set") as fill:
+            cache.get_or_compute(cache.versioned_key("tests", "primary"), lambda: 1)
+            with replica_reads():
+                cache.get_or_compute(cache.versioned_key("tests", "replica"), lambda: 1)
+        self.assertEqual([call.args[2] for call in fill.call_args_list], [3600, 60])
+
+    @override_settings(VOYAGE_CACHE_TIMEOUT=3600, VOYAGE_REPLICA_CACHE_TIMEOUT=60)
+    async def test_async_cache_fill_timeout(self, configured):
+        """
+        aget_or_compute caps replica fills as well
+        """
+
+        async def compute():
+            return 1
+
+        key = await cache.aversioned_key("tests", "areplica")
+        with patch.object(cache.cache, "aset") as fill:
+            with replica_reads():
+                await cache.aget_or_compute(key, compute)
+        self.assertEqual(fill.call_args.args[2], 60)
+
+
+class AverageAtTests(TestCase):
+    """
+    history.average_at before and after the first snapshot
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty, cls.student, cls.assignment = cohort()
+
+    def grade(self, grade):
+        """
+        save a grade through the model, recording its event
+        """
+        submission = StudentAssignment.objects.get(
+            student=self.student, assignment=self.assignment
+        )
+        submission.grade = grade
+        submission.save()
+
+    def test_without_snapshot(self):
+        """
+        live totals rolled back by the events since at
+        """
+        self.grade(60)
+        before = timezone.now()
+        self.grade(90)
+        self.assertEqual(
+            history.average_at(before, program=self.student.program_id),
+            {"average": 60, "graded": 1, "snapshot": None},
+        )
+        self.assertEqual(
+            history.average_at(timezone.now(), assignment=self.assignment.pk)[
+                "average"
+            ],
+            90,
+        )
+
+    def test_with_snapshot(self):
+        """
+        the snapshot plus the events recorded after it
+        """
+        self.grade(60)
+        snap = history.snapshot()
+        self.grade(80)
+        self.assertEqual(
+            history.average_at(timezone.now(), course=self.assignment.course_id),
+            {"average": 80, "graded": 1, "snapshot": snap.taken},
+        )
+
+
+class ProvisionAssignmentReposTests(TestCase):
+    """
+    provision_assignment_repos against a local bare repo standing in for the
+    git host, with the tasks run eagerly
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty, cls.student, cls.assignment = cohort()
+        Student.objects.create(
+            user=get_user_model().objects.create_user("student-2"),
+            github="student-2",
+            program=cls.student.program,
+        )
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        mirror = os.path.join(workdir.name, "mirror")
+        # source_url maps the content repo url to <mirror>/example/content-1
+        subprocess.run(
+            ["git", "init", "--bare", "--quiet", f"{mirror}/example/content-1"],
+            check=True,
+        )
+        self.root = os.path.join(workdir.name, "repos")
+        overrides = override_settings(
+            VOYAGE_REPO_MIRROR=mirror, VOYAGE_REPO_ROOT=self.root
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        conf = provision_assignment_repos.app.conf
+        eager = conf.task_always_eager, conf.task_eager_propagates
+        conf.task_always_eager = conf.task_eager_propagates = True
+        self.addCleanup(setattr, conf, "task_always_eager", eager[0])
+        self.addCleanup(setattr, conf, "task_eager_propagates", eager[1])
+
+    def test_provisioning(self):
+        """
+        a cloned StudentRepo per student, with the progress recorded
+        """
+        self.assertEqual(provision_assignment_repos.delay(self.assignment.pk).get(), 2)
+        repos = StudentRepo.objects.filter(assignment=self.assignment)
+        self.assertEqual(
+            sorted(repos.values_list("student__github", "status", "attempts")),
+            [
+                ("student-1", StudentRepo.CLONED, 1),
+                ("student-2", StudentRepo.CLONED, 1),
+            ],
+        )
+        for repo in repos:
+            self.assertTrue(repo.path.startswith(self.root))
+            self.assertTrue(os.path.exists(os.path.join(repo.path, "HEAD")))
+        self.assertEqual(
+            RepoProvisioning.objects.get(assignment=self.assignment).progress(),
+            {
+                "assignment": self.assignment.pk,
+                "total": 2,
+                "succeeded": 2,
+                "failed": 0,
+                "pending": 0,
+                "done": True,
+            },
+        )
+
+    def test_rerun_is_idempotent(self):
+        """
+        a second run finds nothing pending and clones nothing again
+        """
+        provision_assignment_repos.delay(self.assignment.pk)
+        self.assertEqual(provision_assignment_repos.delay(self.assignment.pk).get(), 0)
+        self.assertEqual(
+            list(
+                StudentRepo.objects.filter(assignment=self.assignment).values_list(
+                    "attempts", flat=True
+                )
+            ),
+            [1, 1],
+        )
+        progress = RepoProvisioning.objects.get(assignment=self.assignment).progress()
+        self.assertEqual((progress["total"], progress["succeeded"]), (2, 2))
+
+
+class ProcessDeadlinesTests(TestCase):
+    """
+    deadlines.process of rows created after their assignment fell due
+    """
+
+    def test_rows_created_after_the_watermark(self):
+        """
+        a row backfilled for an assignment the last run already marked is
+        marked by the next run
+        """
+        faculty, student, assignment = cohort()
+        Assignment.objects.filter(pk=assignment.pk).update(
+            due=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(deadlines.process().assignments, 1)
+
+        late = Student.objects.create(
+            user=get_user_model().objects.create_user("student-2"),
+            github="student-2",
+            program=student.program,
+        )
+        # bulk_create, as backfill_student_assignments and the import do
+        StudentAssignment.objects.filter(student=late).delete()
+        StudentAssignment.objects.bulk_create(
+            [StudentAssignment(student=late, assignment=assignment)]
+        )
+        self.assertEqual(deadlines.process().assignments, 0)
+        self.assertEqual(
+            sorted(
+                StudentAssignment.objects.filter(assignment=assignment).values_list(
+                    "student__github", "status"
+                )
+            ),
+            [
+                ("student-1", StudentAssignment.MISSING),
+                ("student-2", StudentAssignment.MISSING),
+            ],
+        )
+
+
+class SharedCacheTests(SimpleTestCase):
+    """
+    process-local cache backends
+    """
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_locmem(self):
+        """
+        check --deploy warns and voyage_cache refuses
+        """
+        self.assertEqual(
+            [warning.id for warning in check_shared_cache(None)], ["voyage.W001"]
+        )
+        with self.assertRaises(CommandError):
+            call_command("voyage_cache")
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": os.path.join(tempfile.gettempdir(), "voyage-tests"),
+            }
+        }
+    )
+    def test_file(self):
+        """
+        a file cache is shared by the processes of a host
+        """
+        self.assertEqual(check_shared_cache(None), [])
+
+
+@skipUnless(connection.vendor == "sqlite", "query plans are checked on SQLite")
+class HotQueryPlanTests(TestCase):
+    """
+    EXPLAIN QUERY PLAN of the voyage hot filters
+    """
+
+    def test_hot_queries_use_their_index(self):
+        """
+        every hot filter is served by the index meant for it, so a lost
+        composite or partial index fails even when another index stands in
+        """
+        for name, (queryset, index) in hot_queries().items():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertTrue(uses_index(plan, index), f"{index} not in {plan}")
+
+
+class SeederTests(TestCase):
+    """
+    Seeder dates
+    """
+
+    def test_seeded_dates_are_anchored(self):
+        """
+        a seeded run dates everything from EPOCH, not the wall clock
+        """
+        Seeder(seed=1).run(
+            faculty=1,
+            programs=1,
+            courses=1,
+            content=2,
+            assignments=2,
+            students=2,
+            submissions=4,
+        )
+        for due in Assignment.objects.values_list("due", flat=True):
+            self.assertLessEqual(abs(due - EPOCH), timedelta(days=30))
+
+
+@override_settings(
+    SQL_INSTRUMENTATION=True,
+    SQL_INSTRUMENTATION_SAMPLE_RATE=1.0,
+    MIDDLEWARE=[
+        "project.middleware.QueryInstrumentationMiddleware",
+        *settings.MIDDLEWARE,
+    ],
+)
+class QueryInstrumentationMiddlewareTests(TestCase):
+    """
+    QueryInstrumentationMiddleware header and streamed responses
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty, cls.student, cls.assignment = cohort()
+        cls.faculty.user.is_staff = True
+        cls.faculty.user.save()
+        cls.faculty.user.user_permissions.add(
+            Permission.objects.get(codename="change_studentassignment")
+        )
+
+    def test_server_timing_for_staff_only(self):
+        """
+        the header goes to staff, not to other users
+        """
+        url = reverse("import_gradebook")
+        self.client.force_login(self.student.user)
+        self.assertNotIn("Server-Timing", self.client.get(url))
+        self.client.force_login(self.faculty.user)
+        self.assertIn("queries", self.client.get(url)["Server-Timing"])
+
+    def test_streamed_queries_are_counted(self):
+        """
+        the queries of a streamed export are logged once it is sent
+        """
+        self.client.force_login(self.faculty.user)
+        with self.assertLogs("project.sql", "INFO") as logs:
+            response = self.client.get(reverse("export_gradebook"))
+            before = int(re.search(r"(\d+) queries", response["Server-Timing"])[1])
+            self.assertEqual(logs.output, [])
+            b"".join(response.streaming_content)
+        logged = int(re.search(r": (\d+) queries", logs.output[0])[1])
+        self.assertGreater(logged, before)
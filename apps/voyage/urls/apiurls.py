@@ -0,0 +1,18 @@
+from rest_framework.routers import DefaultRouter
+
+from ..views.apiviews import (
+    AssignmentViewSet,
+    CourseViewSet,
+    ProgramViewSet,
+    StudentViewSet,
+    SubmissionViewSet,
+)
+
+router = DefaultRouter()
+router.register("programs", ProgramViewSet)
+router.register("courses", CourseViewSet)
+router.register("students", StudentViewSet)
+router.register("assignments", AssignmentViewSet)
+router.register("submissions", SubmissionViewSet)
+
+urlpatterns = router.urls
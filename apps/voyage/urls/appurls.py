@@ -1,16 +1,71 @@
 from django.urls import path
 
-from ..views.appviews import VoyageDefaultView, FacultyDashboardView, StudentDashboardView, StudentAssignmentView, StudentSubmittedAssignmentsView, CreateNewCourse, CreateNewAssignment, StudentHomeview, FacultyHomeView
+from ..views.appviews import (
+    VoyageDefaultView,
+    FacultyDashboardView,
+    StudentDashboardView,
+    StudentAssignmentView,
+    StudentSubmittedAssignmentsView,
+    CreateNewCourse,
+    CreateNewAssignment,
+    StudentHomeview,
+    FacultyHomeView,
+    GradebookExportView,
+    GradebookImportView,
+    AssignmentProvisioningView,
+)
+from ..views.asyncviews import (
+    AsyncFacultyDashboardView,
+    AsyncStudentDashboardView,
+    AsyncStudentAssignmentView,
+)
 
 urlpatterns = [
     path("", VoyageDefaultView.as_view(), name="home"),
-    path("home/faculty/", FacultyHomeView.as_view(), name='faculty_home'),
-    path("home/student/", StudentHomeview.as_view(), name='student_home'),
-    path('dashboard/faculty/<int:faculty_id>/', FacultyDashboardView.as_view(), name="faculty_dashboard"),
-    path('dashboard/student/<int:student_id>/', StudentDashboardView.as_view(), name="student_dashboard"),
-    path('student-assignments/<int:student_id>/', StudentAssignmentView.as_view(), name="student_assignment"),
-    path('student-submitted-assignments/<int:student_id>/', StudentSubmittedAssignmentsView.as_view(), name="student_submitted_assignment"),
-    path('course/new/', CreateNewCourse.as_view(), name='create_course'),
-    path('assignment/new/', CreateNewAssignment.as_view(), name="create_assignment"),
-
+    path("home/faculty/", FacultyHomeView.as_view(), name="faculty_home"),
+    path("home/student/", StudentHomeview.as_view(), name="student_home"),
+    path(
+        "dashboard/faculty/<int:faculty_id>/",
+        FacultyDashboardView.as_view(),
+        name="faculty_dashboard",
+    ),
+    path(
+        "dashboard/student/<int:student_id>/",
+        StudentDashboardView.as_view(),
+        name="student_dashboard",
+    ),
+    path(
+        "student-assignments/<int:student_id>/",
+        StudentAssignmentView.as_view(),
+        name="student_assignment",
+    ),
+    path(
+        "async/dashboard/faculty/<int:faculty_id>/",
+        AsyncFacultyDashboardView.as_view(),
+        name="async_faculty_dashboard",
+    ),
+    path(
+        "async/dashboard/student/<int:student_id>/",
+        AsyncStudentDashboardView.as_view(),
+        name="async_student_dashboard",
+    ),
+    path(
+        "async/student-assignments/<int:student_id>/",
+        AsyncStudentAssignmentView.as_view(),
+        name="async_student_assignment",
+    ),
+    path(
+        "student-submitted-assignments/<int:student_id>/",
+        StudentSubmittedAssignmentsView.as_view(),
+        name="student_submitted_assignment",
+    ),
+    path("course/new/", CreateNewCourse.as_view(), name="create_course"),
+    path("assignment/new/", CreateNewAssignment.as_view(), name="create_assignment"),
+    path(
+        "assignment/<int:assignment_id>/provisioning/",
+        AssignmentProvisioningView.as_view(),
+        name="assignment_provisioning",
+    ),
+    path("export/gradebook/", GradebookExportView.as_view(), name="export_gradebook"),
+    path("import/gradebook/", GradebookImportView.as_view(), name="import_gradebook"),
 ]
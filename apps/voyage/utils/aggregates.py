@@ -0,0 +1,47 @@
+"""
+Aggregate helpers
+"""
+
+from django.db.models import DecimalField, F, Func, IntegerField, Subquery
+
+
+def subquery_aggregate(
+    queryset, function, column="pk", distinct=False, output_field=None
+):
+    """
+    correlated subquery that aggregates a single column of queryset.
+
+    queryset is expected to be filtered with OuterRef() so that it yields one
+    aggregate value per outer row without joining (and multiplying) the outer
+    query.
+    """
+    extra = {"template": "%(function)s(DISTINCT %(expressions)s)"} if distinct else {}
+    aggregate = Func(
+        F(column),
+        function=function,
+        output_field=output_field or IntegerField(),
+        **extra,
+    )
+    return Subquery(
+        queryset.order_by().annotate(_aggregate=aggregate).values("_aggregate")[:1],
+        output_field=output_field or IntegerField(),
+    )
+
+
+def subquery_count(queryset, column="pk", distinct=False):
+    """
+    number of rows (or distinct column values) in queryset
+    """
+    return subquery_aggregate(queryset, "COUNT", column=column, distinct=distinct)
+
+
+def subquery_sum(queryset, column):
+    """
+    sum of a decimal column in queryset
+    """
+    return subquery_aggregate(
+        queryset,
+        "SUM",
+        column=column,
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
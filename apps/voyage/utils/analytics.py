@@ -0,0 +1,192 @@
+"""
+Grade analytics
+"""
+
+from itertools import chain
+
+import numpy as np
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from ..models import StudentAssignment
+from . import cache
+
+PERCENTILES = (10, 25, 50, 75, 90)
+# |z| at or above which a grade counts as an outlier of its assignment
+OUTLIER_Z = 2
+
+
+def number(value, digits=2):
+    """
+    a numpy scalar as a rounded float, NaN as None
+    """
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+class GradeMatrix:
+    """
+    graded StudentAssignments of a cohort as a sparse students x assignments
+    matrix in coordinate form: parallel arrays of student index, assignment
+    index and grade, loaded with a single values_list query, so every
+    statistic is a vectorized numpy reduction. Cohorts only fill a fraction
+    of the dense matrix, so nothing is computed over the empty cells.
+    """
+
+    def __init__(self, rows):
+        self.student_ids, self.students = np.unique(rows[:, 0], return_inverse=True)
+        self.assignment_ids, self.assignments = np.unique(
+            rows[:, 1], return_inverse=True
+        )
+        self.grades = rows[:, 2]
+
+    @classmethod
+    def load(cls, program=None, course=None):
+        """
+        matrix of the graded rows of program and/or course
+        """
+        queryset = StudentAssignment.objects.filter(grade__isnull=False)
+        if program is not None:
+            queryset = queryset.filter(assignment__program=program)
+        if course is not None:
+            queryset = queryset.filter(assignment__course=course)
+        # cast in SQL so the rows arrive as floats, not Decimals, and stream
+        # them straight into the array without a list of tuples in between
+        rows = queryset.order_by().values_list(
+            "student_id", "assignment_id", Cast("grade", FloatField())
+        )
+        return cls(
+            np.fromiter(
+                chain.from_iterable(rows.iterator(chunk_size=10000)), dtype=np.float64
+            ).reshape(-1, 3)
+        )
+
+    def per_assignment(self, values):
+        """
+        sum of values per assignment
+        """
+        return np.bincount(
+            self.assignments, weights=values, minlength=len(self.assignment_ids)
+        )
+
+    def assignment_statistics(self):
+        """
+        (counts, means, medians, stds) arrays, one entry per assignment
+        """
+        counts = np.bincount(self.assignments, minlength=len(self.assignment_ids))
+        means = self.per_assignment(self.grades) / counts
+        stds = np.sqrt(
+            self.per_assignment((self.grades - means[self.assignments]) ** 2) / counts
+        )
+        # grades sorted within each assignment; the median sits mid-group
+        ordered = self.grades[np.lexsort((self.grades, self.assignments))]
+        starts = np.cumsum(counts) - counts
+        medians = (
+            ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]
+        ) / 2
+        return counts, means, medians, stds
+
+    def z_scores(self, means, stds):
+        """
+        each grade's z-score within its assignment; NaN where the assignment
+        has no spread
+        """
+        spread = np.where(stds > 0, stds, np.nan)[self.assignments]
+        return (self.grades - means[self.assignments]) / spread
+
+    def histogram(self, bins=10):
+        """
+        [{"low", "high", "count"}] of the grades over bins equal ranges
+        """
+        low = min(0, self.grades.min()) if self.grades.size else 0
+        high = max(100, self.grades.max()) if self.grades.size else 100
+        counts, edges = np.histogram(self.grades, bins=bins, range=(low, high))
+        return [
+            {"low": number(edges[i]), "high": number(edges[i + 1]), "count": int(count)}
+            for i, count in enumerate(counts)
+        ]
+
+    def standing(self, z_scores, size=10):
+        """
+        {"top", "bottom"} students by mean z-score across their assignments
+        """
+        scored = ~np.isnan(z_scores)
+        totals = np.bincount(
+            self.students[scored],
+            weights=z_scores[scored],
+            minlength=len(self.student_ids),
+        )
+        counts = np.bincount(self.students[scored], minlength=len(self.student_ids))
+        ranked = np.flatnonzero(counts)
+        means = totals[ranked] / counts[ranked]
+        order = np.argsort(means)
+        ranked, means = ranked[order], means[order]
+
+        def entries(positions):
+            return [
+                {"student": int(self.student_ids[ranked[i]]), "z": number(means[i])}
+                for i in positions
+            ]
+
+        positions = np.arange(len(ranked))
+        return {
+            "top": entries(positions[::-1][:size]),
+            "bottom": entries(positions[:size]),
+        }
+
+    def statistics(self, bins=10, percentiles=PERCENTILES):
+        """
+        cohort summary: counts, mean, median, stddev, percentiles, histogram,
+        per-assignment statistics and the students furthest from the mean
+        """
+        counts, means, medians, stds = self.assignment_statistics()
+        z_scores = self.z_scores(means, stds)
+        summary = dict.fromkeys(("mean", "median", "std"))
+        points = dict.fromkeys(map(str, percentiles))
+        if self.grades.size:
+            summary = {
+                "mean": number(self.grades.mean()),
+                "median": number(np.median(self.grades)),
+                "std": number(self.grades.std()),
+            }
+            points = {
+                str(p): number(value)
+                for p, value in zip(
+                    percentiles, np.percentile(self.grades, percentiles)
+                )
+            }
+        outliers = self.per_assignment(np.abs(z_scores) >= OUTLIER_Z)
+        return {
+            "students": len(self.student_ids),
+            "assignments": len(self.assignment_ids),
+            "count": int(self.grades.size),
+            **summary,
+            "percentiles": points,
+            "histogram": self.histogram(bins),
+            "by_assignment": [
+                {
+                    "id": int(assignment_id),
+                    "count": int(counts[i]),
+                    "mean": number(means[i]),
+                    "median": number(medians[i]),
+                    "std": number(stds[i]),
+                    "outliers": int(outliers[i]),
+                }
+                for i, assignment_id in enumerate(self.assignment_ids)
+            ],
+            "standing": self.standing(z_scores),
+        }
+
+
+def cohort_statistics(program=None, course=None):
+    """
+    statistics of program and/or course, cached in the current generation
+    """
+    return cache.get_or_compute(
+        cache.versioned_key(
+            "statistics",
+            getattr(program, "pk", program),
+            getattr(course, "pk", course),
+        ),
+        lambda: GradeMatrix.load(program=program, course=course).statistics(),
+    )
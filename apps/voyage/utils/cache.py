@@ -0,0 +1,152 @@
+"""
+Versioned voyage cache
+"""
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from project.routers import reading_replica
+
+# every key embeds the current generation, so bumping it retires all
+# cached entries at once and they expire on their own
+GENERATION_KEY = "voyage:generation"
+METRIC_KEYS = {"hits": "voyage:metrics:hits", "misses": "voyage:metrics:misses"}
+
+
+def shared():
+    """
+    whether the cache is seen by every process: with a per-process backend
+    a bump from a worker, a task or a management command does not retire
+    the pages cached by the other processes
+    """
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def increment(key):
+    """
+    add one to a counter that lives forever, creating it if needed
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # add() only succeeds for the first caller; others retry the incr
+        if cache.add(key, 1, timeout=None):
+            return 1
+        return cache.incr(key)
+
+
+def generation():
+    """
+    current generation of voyage data
+    """
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        value = cache.get(GENERATION_KEY, 1)
+    return value
+
+
+def bump():
+    """
+    start a new generation after voyage data changed
+    """
+    return increment(GENERATION_KEY)
+
+
+def versioned_key(*parts):
+    """
+    cache key of parts in the current generation
+    """
+    return ":".join(["voyage", *map(str, parts), f"g{generation()}"])
+
+
+def fill_timeout(timeout=None):
+    """
+    seconds a value computed now is cached: VOYAGE_CACHE_TIMEOUT by default,
+    at most VOYAGE_REPLICA_CACHE_TIMEOUT when it was read from the replica,
+    which may not have caught up with the writes of the current generation
+    """
+    if timeout is None:
+        timeout = settings.VOYAGE_CACHE_TIMEOUT
+    if reading_replica():
+        timeout = min(timeout, settings.VOYAGE_REPLICA_CACHE_TIMEOUT)
+    return timeout
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    cached value of key, computed and stored on a miss, counting hits and
+    misses
+    """
+    value = cache.get(key)
+    if value is not None:
+        increment(METRIC_KEYS["hits"])
+        return value
+    increment(METRIC_KEYS["misses"])
+    value = compute()
+    cache.set(key, value, fill_timeout(timeout))
+    return value
+
+
+async def aincrement(key):
+    """
+    increment, through the async cache API
+    """
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        if await cache.aadd(key, 1, timeout=None):
+            return 1
+        return await cache.aincr(key)
+
+
+async def ageneration():
+    """
+    generation, through the async cache API
+    """
+    value = await cache.aget(GENERATION_KEY)
+    if value is None:
+        await cache.aadd(GENERATION_KEY, 1, timeout=None)
+        value = await cache.aget(GENERATION_KEY, 1)
+    return value
+
+
+async def aversioned_key(*parts):
+    """
+    versioned_key, through the async cache API
+    """
+    return ":".join(["voyage", *map(str, parts), f"g{await ageneration()}"])
+
+
+async def aget_or_compute(key, compute, timeout=None):
+    """
+    get_or_compute with an async compute(), through the async cache API
+    """
+    value = await cache.aget(key)
+    if value is not None:
+        await aincrement(METRIC_KEYS["hits"])
+        return value
+    await aincrement(METRIC_KEYS["misses"])
+    value = await compute()
+    await cache.aset(key, value, fill_timeout(timeout))
+    return value
+
+
+def metrics():
+    """
+    {"hits", "misses", "ratio"} since the counters were last reset
+    """
+    counts = cache.get_many(METRIC_KEYS.values())
+    values = {name: counts.get(key, 0) for name, key in METRIC_KEYS.items()}
+    total = values["hits"] + values["misses"]
+    values["ratio"] = round(values["hits"] / total, 4) if total else None
+    return values
+
+
+def reset_metrics():
+    """
+    zero the hit and miss counters
+    """
+    cache.delete_many(METRIC_KEYS.values())
@@ -0,0 +1,114 @@
+"""
+Dashboard data
+"""
+
+from django.db.models import OuterRef
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from ..models import Assignment, Student
+from .aggregates import subquery_count
+from .cache import aget_or_compute, aversioned_key, get_or_compute, versioned_key
+
+
+def course_counts(courses, students=True):
+    """
+    courses annotated with num_assignments and, with students,
+    num_students, as {"id", "name", ...counts} rows
+    """
+    counts = {
+        "num_assignments": subquery_count(
+            Assignment.objects.filter(course=OuterRef("pk"))
+        ),
+    }
+    if students:
+        # students of the programs that teach the course; a semi-join, so
+        # students are not multiplied by the program's assignments
+        counts["num_students"] = subquery_count(
+            Student.objects.filter(
+                program__in=Assignment.objects.filter(
+                    course=OuterRef(OuterRef("pk"))
+                ).values("program")
+            )
+        )
+    return courses.annotate(**counts).order_by("name").values("id", "name", *counts)
+
+
+def course_rows(courses, students=True):
+    """
+    [{"id", "name", "num_assignments"[, "num_students"]}] for courses,
+    counted in the same query that lists them
+    """
+    return list(course_counts(courses, students=students))
+
+
+async def acourse_rows(courses, students=True):
+    """
+    course_rows, read with async iteration
+    """
+    return [row async for row in course_counts(courses, students=students)]
+
+
+def cache_name(owner):
+    """
+    cache key part of a faculty or student
+    """
+    return f"{owner._meta.model_name}-{owner.pk}"
+
+
+def cached_course_rows(owner, courses, students=True):
+    """
+    course_rows of a faculty or student, cached in the current generation
+    """
+    return get_or_compute(
+        versioned_key("dashboard", cache_name(owner), "rows"),
+        lambda: course_rows(courses, students=students),
+    )
+
+
+def course_table(owner, courses, students=True):
+    """
+    rendered course table of a faculty or student dashboard, cached in the
+    current generation so it is rendered again only after voyage data changed
+    """
+
+    def render():
+        return render_course_table(
+            cached_course_rows(owner, courses, students=students), students=students
+        )
+
+    table = get_or_compute(
+        versioned_key("dashboard", cache_name(owner), "table"), render
+    )
+    # rendered by the template engine, so already escaped
+    return mark_safe(table)
+
+
+def render_course_table(rows, students=True):
+    """
+    the course table fragment of rows
+    """
+    return render_to_string(
+        "voyage/_dashboard-table.html", {"courses": rows, "students": students}
+    )
+
+
+async def acourse_table(owner, courses, students=True):
+    """
+    course_table, through the async ORM and cache APIs
+    """
+    name = cache_name(owner)
+
+    async def rows():
+        return await aget_or_compute(
+            await aversioned_key("dashboard", name, "rows"),
+            lambda: acourse_rows(courses, students=students),
+        )
+
+    async def render():
+        return render_course_table(await rows(), students=students)
+
+    table = await aget_or_compute(
+        await aversioned_key("dashboard", name, "table"), render
+    )
+    return mark_safe(table)
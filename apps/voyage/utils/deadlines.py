@@ -0,0 +1,146 @@
+"""
+Submission deadlines
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from ..models import (
+    Assignment,
+    DeadlineDigest,
+    DeadlineRun,
+    StudentAssignment,
+)
+from . import cache
+from .seed import chunked
+
+# assignments marked per transaction
+BATCH_SIZE = 50
+
+
+def mark(rows, now):
+    """
+    set the status of rows of past due assignments with set-based UPDATEs:
+    missing without a submission, else late or on time against the due
+    date; return the number of rows updated
+    """
+    return (
+        rows.filter(submitted__isnull=True).update(
+            status=StudentAssignment.MISSING, dtm_updated=now
+        )
+        + rows.filter(submitted__gt=F("assignment__due")).update(
+            status=StudentAssignment.LATE, dtm_updated=now
+        )
+        + rows.filter(submitted__lte=F("assignment__due")).update(
+            status=StudentAssignment.ON_TIME, dtm_updated=now
+        )
+    )
+
+
+def watermark():
+    """
+    through of the latest run, None before the first
+    """
+    return (
+        DeadlineRun.objects.order_by("-through")
+        .values_list("through", flat=True)
+        .first()
+    )
+
+
+def digest(run, assignments):
+    """
+    a DeadlineDigest per program of the status counts of the submissions to
+    assignments, from one grouped query
+    """
+    statuses = {
+        status: Count("id", filter=Q(status=value))
+        for status, value in (
+            ("on_time", StudentAssignment.ON_TIME),
+            ("late", StudentAssignment.LATE),
+            ("missing", StudentAssignment.MISSING),
+        )
+    }
+    rows = (
+        StudentAssignment.objects.filter(assignment__in=assignments.values("id"))
+        .order_by()
+        .values("assignment__program")
+        .annotate(assignments=Count("assignment", distinct=True), **statuses)
+    )
+    return DeadlineDigest.objects.bulk_create(
+        [
+            DeadlineDigest(
+                run=run,
+                program_id=row["assignment__program"],
+                assignments=row["assignments"],
+                on_time=row["on_time"],
+                late=row["late"],
+                missing=row["missing"],
+            )
+            for row in rows
+        ]
+    )
+
+
+def process(now=None, batch_size=BATCH_SIZE, log=None):
+    """
+    mark the submissions of the assignments that fell due since the last
+    run, batch_size assignments per transaction, then the open rows of
+    assignments already past due (created since by a backfill, an import or
+    an enrolment) and the missing rows that have been submitted since, and
+    record the run with its per-program digests as the new watermark;
+    return the run
+    """
+    log = log or (lambda message: None)
+    now = now or timezone.now()
+    due = Assignment.objects.filter(due__lte=now)
+    through = watermark()
+    if through is not None:
+        due = due.filter(due__gt=through)
+    assignment_ids = list(due.order_by("due", "id").values_list("id", flat=True))
+    marked = 0
+    for batch in chunked(assignment_ids, batch_size):
+        with transaction.atomic():
+            marked += mark(
+                StudentAssignment.objects.filter(assignment_id__in=batch), now
+            )
+        log(f"{len(batch)} assignments, {marked} submissions marked")
+
+    with transaction.atomic():
+        # rows created after their assignment was marked
+        marked += mark(
+            StudentAssignment.objects.filter(
+                status=StudentAssignment.OPEN,
+                assignment_id__in=Assignment.objects.filter(due__lte=now).values("id"),
+            ),
+            now,
+        )
+        # submissions that arrived after an earlier run marked them missing
+        marked += mark(
+            StudentAssignment.objects.filter(
+                status=StudentAssignment.MISSING, submitted__isnull=False
+            ),
+            now,
+        )
+        run = DeadlineRun.objects.create(through=now, assignments=len(assignment_ids))
+        digest(run, due)
+    if marked:
+        cache.bump()
+    return run
+
+
+def reschedule(assignment):
+    """
+    statuses of an assignment whose due date changed: open again, or marked
+    right away if the new date is already behind the watermark
+    """
+    now = timezone.now()
+    rows = StudentAssignment.objects.filter(assignment=assignment)
+    through = watermark()
+    with transaction.atomic():
+        rows.exclude(status=StudentAssignment.OPEN).update(
+            status=StudentAssignment.OPEN, dtm_updated=now
+        )
+        if through is not None and assignment.due <= through:
+            mark(rows, now)
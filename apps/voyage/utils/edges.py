@@ -0,0 +1,63 @@
+"""
+Assignment edges
+"""
+
+from django.db import transaction
+
+from ..models import Assignment, AssignmentEdge, Content
+
+
+def sync(assignment):
+    """
+    create or update the edge of a saved assignment
+    """
+    faculty_id = (
+        Content.objects.filter(pk=assignment.content_id)
+        .values_list("faculty_id", flat=True)
+        .first()
+    )
+    AssignmentEdge.objects.update_or_create(
+        assignment_id=assignment.pk,
+        defaults={
+            "faculty_id": faculty_id,
+            "program_id": assignment.program_id,
+            "course_id": assignment.course_id,
+            "content_id": assignment.content_id,
+        },
+    )
+
+
+def move_content(content):
+    """
+    point the edges of content at its current faculty
+    """
+    AssignmentEdge.objects.filter(content=content).exclude(
+        faculty_id=content.faculty_id
+    ).update(faculty_id=content.faculty_id)
+
+
+@transaction.atomic
+def rebuild(batch_size=2000):
+    """
+    recompute every edge from Assignment rows, for data written without
+    signals (bulk_create, fixtures); return the number of edges
+    """
+    AssignmentEdge.objects.all().delete()
+    edges = AssignmentEdge.objects.bulk_create(
+        [
+            AssignmentEdge(
+                assignment_id=pk,
+                faculty_id=faculty_id,
+                program_id=program_id,
+                course_id=course_id,
+                content_id=content_id,
+            )
+            for pk, faculty_id, program_id, course_id, content_id in (
+                Assignment.objects.values_list(
+                    "id", "content__faculty_id", "program_id", "course_id", "content_id"
+                ).iterator()
+            )
+        ],
+        batch_size=batch_size,
+    )
+    return len(edges)
@@ -0,0 +1,121 @@
+"""
+Gradebook
+"""
+
+from collections import defaultdict, namedtuple
+
+from django.db.models import Count, Q, Sum
+
+from ..models import StudentAssignment
+
+
+class GradebookEntry(namedtuple("GradebookEntry", "grade_total entries submissions")):
+    """
+    grade total, number of rows and number of submitted rows for one
+    (student, assignment) pair
+    """
+
+    __slots__ = ()
+
+    @property
+    def average(self):
+        """
+        average grade of the rows, ungraded rows counting as zero
+        """
+        if not self.entries:
+            return None
+        return round((self.grade_total or 0) / self.entries, 2)
+
+
+class Gradebook:
+    """
+    per-student, per-assignment grade averages and submission counts,
+    computed for a whole set of students with a single grouped query
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_student = defaultdict(dict)
+        for (student_id, assignment_id), entry in entries.items():
+            self.by_student[student_id][assignment_id] = entry
+
+    @staticmethod
+    def rows(students, assignments=None):
+        """
+        (student_id, assignment_id, grade_total, entries, submissions) rows;
+        students and assignments may be querysets, model instances or ids
+        """
+        queryset = StudentAssignment.objects.filter(student__in=students)
+        if assignments is not None:
+            queryset = queryset.filter(assignment__in=assignments)
+        return (
+            queryset.order_by()
+            .values("student_id", "assignment_id")
+            .annotate(
+                grade_total=Sum("grade"),
+                entries=Count("id"),
+                submissions=Count("id", filter=Q(submitted__isnull=False)),
+            )
+            .values_list(
+                "student_id", "assignment_id", "grade_total", "entries", "submissions"
+            )
+        )
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        gradebook of rows()
+        """
+        return cls(
+            {
+                (student_id, assignment_id): GradebookEntry(*values)
+                for student_id, assignment_id, *values in rows
+            }
+        )
+
+    @classmethod
+    def for_students(cls, students, assignments=None):
+        """
+        gradebook of students, limited to assignments
+        """
+        return cls.from_rows(cls.rows(students, assignments))
+
+    @classmethod
+    async def afor_students(cls, students, assignments=None):
+        """
+        for_students, read with async iteration
+        """
+        return cls.from_rows([row async for row in cls.rows(students, assignments)])
+
+    @classmethod
+    def for_program(cls, program, assignments=None):
+        """
+        gradebook of every student in program
+        """
+        return cls.for_students(program.student_set.all(), assignments=assignments)
+
+    def get(self, student_id, assignment_id):
+        """
+        entry for a (student, assignment) pair, or None
+        """
+        return self.entries.get((student_id, assignment_id))
+
+    def average(self, student_id, assignment_id):
+        """
+        average grade for a (student, assignment) pair
+        """
+        entry = self.get(student_id, assignment_id)
+        return entry.average if entry else None
+
+    def submissions(self, student_id, assignment_id):
+        """
+        number of submissions for a (student, assignment) pair
+        """
+        entry = self.get(student_id, assignment_id)
+        return entry.submissions if entry else 0
+
+    def for_student(self, student_id):
+        """
+        {assignment_id: entry} for one student
+        """
+        return self.by_student.get(student_id, {})
@@ -0,0 +1,82 @@
+"""
+Bulk grading
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import StudentAssignment
+from . import cache, history, rollups
+
+GRADING_FIELDS = ["grade", "feedback"]
+
+
+@transaction.atomic
+def save_grades(submissions, reviewer=None, batch_size=1000):
+    """
+    write the grade and feedback of changed StudentAssignment instances in
+    one transaction, stamping graded rows as reviewed by reviewer (left as
+    stored when None), clearing the review of ungraded ones and appending
+    the changes to the grade history.
+
+    rollups of the touched students, assignments and courses are rebuilt
+    and the cache generation bumped once for the whole batch, since bulk
+    writes do not send the signals that maintain them. return the number
+    of rows written.
+    """
+    if not submissions:
+        return 0
+    now = timezone.now()
+    # grades and courses as stored, for the history and the rollups
+    stored = {
+        pk: (grade, course_id)
+        for pk, grade, course_id in StudentAssignment.objects.filter(
+            id__in=[submission.pk for submission in submissions]
+        ).values_list("id", "grade", "assignment__course_id")
+    }
+    graded = [
+        submission.pk for submission in submissions if submission.grade is not None
+    ]
+    ungraded = [submission.pk for submission in submissions if submission.grade is None]
+    review = {"reviewed": now}
+    if reviewer is not None:
+        review["reviewer"] = reviewer
+
+    # bulk_update builds a CASE per field and row, so only the edited
+    # fields go through it; the review stamp is the same for every row
+    StudentAssignment.objects.bulk_update(
+        submissions, GRADING_FIELDS, batch_size=batch_size
+    )
+    StudentAssignment.objects.filter(id__in=graded).update(dtm_updated=now, **review)
+    StudentAssignment.objects.filter(id__in=ungraded).update(
+        dtm_updated=now, reviewed=None
+    )
+    for submission in submissions:
+        if submission.grade is None:
+            submission.reviewed = None
+            continue
+        submission.reviewed = now
+        if reviewer is not None:
+            submission.reviewer = reviewer
+
+    history.record(
+        [
+            (
+                submission.student_id,
+                submission.assignment_id,
+                stored[submission.pk][0],
+                submission.grade,
+                submission.feedback,
+            )
+            for submission in submissions
+        ],
+        recorded=now,
+        batch_size=batch_size,
+    )
+    rollups.rebuild(
+        students={submission.student_id for submission in submissions},
+        assignments={submission.assignment_id for submission in submissions},
+        courses={course_id for _, course_id in stored.values()},
+    )
+    transaction.on_commit(cache.bump)
+    return len(submissions)
@@ -0,0 +1,131 @@
+"""
+Grade history
+"""
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import GradeEvent, GradeSnapshot, GradeSnapshotTotal, StudentAssignment
+
+ZERO = Value(0, output_field=DecimalField(max_digits=5, decimal_places=2))
+
+
+def record(changes, recorded=None, batch_size=1000):
+    """
+    append a GradeEvent per (student_id, assignment_id, previous, grade,
+    feedback) change in one bulk_create; return the number written
+    """
+    recorded = recorded or timezone.now()
+    events = GradeEvent.objects.bulk_create(
+        [
+            GradeEvent(
+                student_id=student_id,
+                assignment_id=assignment_id,
+                previous=previous,
+                grade=grade,
+                feedback=feedback,
+                recorded=recorded,
+            )
+            for student_id, assignment_id, previous, grade, feedback in changes
+        ],
+        batch_size=batch_size,
+    )
+    return len(events)
+
+
+@transaction.atomic
+def snapshot(taken=None):
+    """
+    compact the history up to taken (now by default) into a GradeSnapshot of
+    every assignment's graded totals, read from the StudentAssignment rows
+    """
+    taken = taken or timezone.now()
+    snap = GradeSnapshot.objects.create(taken=taken)
+    totals = (
+        StudentAssignment.objects.filter(grade__isnull=False)
+        .order_by()
+        .values("assignment_id")
+        .annotate(grade_sum=Sum("grade"), graded_count=Count("id"))
+        .values_list("assignment_id", "grade_sum", "graded_count")
+    )
+    GradeSnapshotTotal.objects.bulk_create(
+        [
+            GradeSnapshotTotal(
+                snapshot=snap,
+                assignment_id=assignment_id,
+                grade_sum=grade_sum,
+                graded_count=graded_count,
+            )
+            for assignment_id, grade_sum, graded_count in totals
+        ],
+        batch_size=2000,
+    )
+    return snap
+
+
+def scope_filter(program=None, course=None, assignment=None):
+    """
+    assignment lookups of a program, course and/or assignment
+    """
+    lookups = {}
+    if program is not None:
+        lookups["assignment__program"] = program
+    if course is not None:
+        lookups["assignment__course"] = course
+    if assignment is not None:
+        lookups["assignment"] = assignment
+    return lookups
+
+
+def average_at(at, program=None, course=None, assignment=None):
+    """
+    {"average", "graded", "snapshot"} of the grades of a program, course
+    and/or assignment as they stood at at: the latest snapshot taken by
+    then plus the events recorded between the two. before the first
+    snapshot the live StudentAssignment totals are rolled back by the
+    events recorded since at, and snapshot is None.
+    """
+    lookups = scope_filter(program, course, assignment)
+    snap = GradeSnapshot.objects.filter(taken__lte=at).order_by("-taken").first()
+    if snap is not None:
+        base = snap.totals.filter(**lookups).aggregate(
+            grade_sum=Sum("grade_sum", default=0),
+            graded=Sum("graded_count", default=0),
+        )
+        events = GradeEvent.objects.filter(
+            recorded__gt=snap.taken, recorded__lte=at, **lookups
+        )
+        sign = 1
+    else:
+        base = StudentAssignment.objects.filter(
+            grade__isnull=False, **lookups
+        ).aggregate(grade_sum=Sum("grade", default=0), graded=Count("id"))
+        events = GradeEvent.objects.filter(recorded__gt=at, **lookups)
+        sign = -1
+    delta = events.aggregate(
+        grade_sum=Sum(Coalesce("grade", ZERO) - Coalesce("previous", ZERO), default=0),
+        # rows that became graded minus rows whose grade was cleared
+        graded=Count("grade") - Count("previous"),
+    )
+    graded = base["graded"] + sign * delta["graded"]
+    grade_sum = base["grade_sum"] + sign * delta["grade_sum"]
+    return {
+        "average": round(grade_sum / graded, 2) if graded else None,
+        "graded": graded,
+        "snapshot": snap.taken if snap is not None else None,
+    }
+
+
+def trajectory(student, assignment=None):
+    """
+    (recorded, assignment_id, previous, grade) of every grade change of a
+    student, oldest first, from the (student, recorded) index
+    """
+    events = GradeEvent.objects.filter(student=student)
+    if assignment is not None:
+        events = events.filter(assignment=assignment)
+    return events.order_by("recorded", "id").values_list(
+        "recorded", "assignment_id", "previous", "grade"
+    )
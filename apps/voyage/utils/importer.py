@@ -0,0 +1,221 @@
+"""
+Gradebook import
+"""
+
+from collections import namedtuple
+import csv
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Assignment, Faculty, Student, StudentAssignment
+from . import cache, history, rollups
+from .seed import chunked
+
+# columns share their names with the gradebook export, so an exported file
+# can be edited and imported back
+REQUIRED = ("student", "assignment_id", "grade")
+# feedback and reviewer are optional; a field is only written when its
+# column is in the header, so a grades-only file leaves them as stored
+UPDATE_FIELDS = ["grade", "feedback", "reviewer"]
+
+RowError = namedtuple("RowError", "line message")
+
+
+class GradebookImport:
+    """
+    apply grades from CSV rows of (student, assignment_id, grade, feedback,
+    reviewer) with bulk_update/bulk_create, batch_size rows per transaction.
+
+    students, faculty and assignments are resolved from lookup maps loaded
+    once up front. rows that match the stored values are left alone. invalid
+    rows are reported in errors and skipped; the rest of their batch is
+    still applied. only the columns present in the header are written.
+    grade and feedback changes are appended to the grade history with their
+    batch. rollups of the changed students, assignments and courses are
+    rebuilt with each batch and the cache generation bumped once at the
+    end, since bulk writes do not send the signals that maintain them.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.errors = []
+        self.students = {}
+        self.faculty = {}
+        self.assignments = {}
+        self.fields = UPDATE_FIELDS
+        self.grade_field = StudentAssignment._meta.get_field("grade")
+
+    def load(self):
+        """
+        {github: (id, program_id)}, {github: id} and {id: (program_id,
+        course_id)} lookup maps
+        """
+        self.students = {
+            github: (pk, program_id)
+            for github, pk, program_id in Student.objects.values_list(
+                "github", "id", "program_id"
+            )
+        }
+        self.faculty = dict(Faculty.objects.values_list("github", "id"))
+        self.assignments = {
+            pk: (program_id, course_id)
+            for pk, program_id, course_id in Assignment.objects.values_list(
+                "id", "program_id", "course_id"
+            )
+        }
+
+    def run(self, lines):
+        """
+        import CSV lines (a text file or any iterable of strings)
+        """
+        reader = csv.DictReader(lines)
+        missing = [
+            column for column in REQUIRED if column not in (reader.fieldnames or ())
+        ]
+        if missing:
+            self.errors.append(RowError(1, f"missing columns: {', '.join(missing)}"))
+            return self
+
+        self.fields = [
+            field
+            for field in UPDATE_FIELDS
+            if field in REQUIRED or field in reader.fieldnames
+        ]
+        self.load()
+        written = 0
+        # the header is line 1
+        numbered = enumerate(reader, start=2)
+        for batch in chunked(numbered, self.batch_size):
+            changes = {}
+            for line, row in batch:
+                try:
+                    key, values = self.parse(row)
+                except ValidationError as exc:
+                    self.errors.append(RowError(line, "; ".join(exc.messages)))
+                    continue
+                # the last row for a student and assignment wins
+                changes[key] = values
+            if changes:
+                written += len(self.apply(changes))
+
+        if written:
+            cache.bump()
+        return self
+
+    def parse(self, row):
+        """
+        ((student_id, assignment_id), field values) of a CSV row
+        """
+        github = (row["student"] or "").strip()
+        if github not in self.students:
+            raise ValidationError(f"unknown student {github!r}")
+        student_id, program_id = self.students[github]
+
+        try:
+            assignment_id = int(row["assignment_id"])
+        except (TypeError, ValueError) as exc:
+            raise ValidationError(
+                f"invalid assignment_id {row['assignment_id']!r}"
+            ) from exc
+        if assignment_id not in self.assignments:
+            raise ValidationError(f"unknown assignment {assignment_id}")
+        if self.assignments[assignment_id][0] != program_id:
+            raise ValidationError(
+                f"assignment {assignment_id} is not in the program of {github}"
+            )
+
+        try:
+            grade = self.grade_field.clean((row["grade"] or "").strip() or None, None)
+        except ValidationError as exc:
+            raise ValidationError(f"grade: {' '.join(exc.messages)}") from exc
+
+        values = {"grade": grade}
+        if "feedback" in self.fields:
+            values["feedback"] = (row["feedback"] or "").strip() or None
+        if "reviewer" in self.fields:
+            reviewer_id = None
+            reviewer = (row["reviewer"] or "").strip()
+            if reviewer:
+                if reviewer not in self.faculty:
+                    raise ValidationError(f"unknown reviewer {reviewer!r}")
+                reviewer_id = self.faculty[reviewer]
+            values["reviewer_id"] = reviewer_id
+        return (student_id, assignment_id), values
+
+    def apply(self, changes):
+        """
+        update the existing StudentAssignment rows of changes that differ and
+        create the missing ones, and rebuild the rollups they touch, in one
+        transaction; return the written (student_id, assignment_id) pairs
+        """
+        now = timezone.now()
+        students = {student_id for student_id, _ in changes}
+        assignments = {assignment_id for _, assignment_id in changes}
+        existing = {
+            (submission.student_id, submission.assignment_id): submission
+            for submission in StudentAssignment.objects.filter(
+                student_id__in=students, assignment_id__in=assignments
+            )
+        }
+
+        updates, creates, events = [], [], []
+        for (student_id, assignment_id), values in changes.items():
+            submission = existing.get((student_id, assignment_id))
+            previous = (None, None)
+            if submission is not None:
+                previous = (submission.grade, submission.feedback)
+            # feedback stays as stored when its column is not imported
+            current = (values["grade"], values.get("feedback", previous[1]))
+            if previous != current:
+                events.append((student_id, assignment_id, previous[0], *current))
+            if submission is None:
+                submission = StudentAssignment(
+                    student_id=student_id,
+                    assignment_id=assignment_id,
+                    reviewed=now if values["grade"] is not None else None,
+                    **values,
+                )
+                creates.append(submission)
+            elif any(
+                getattr(submission, field) != value for field, value in values.items()
+            ):
+                for field, value in values.items():
+                    setattr(submission, field, value)
+                updates.append(submission)
+            else:
+                self.unchanged += 1
+
+        # bulk_update builds a CASE per field and row, so only the imported
+        # fields go through it; the timestamps are the same for every row
+        ids = [submission.pk for submission in updates]
+        with transaction.atomic():
+            StudentAssignment.objects.bulk_update(
+                updates, self.fields, batch_size=self.batch_size
+            )
+            StudentAssignment.objects.filter(id__in=ids).update(dtm_updated=now)
+            StudentAssignment.objects.filter(
+                id__in=ids, grade__isnull=False, reviewed__isnull=True
+            ).update(reviewed=now)
+            StudentAssignment.objects.bulk_create(creates, batch_size=self.batch_size)
+            history.record(events, recorded=now, batch_size=self.batch_size)
+            written = updates + creates
+            if written:
+                # scoped to the batch, so the IN lists stay within batch_size
+                rollups.rebuild(
+                    students={submission.student_id for submission in written},
+                    assignments={submission.assignment_id for submission in written},
+                    courses={
+                        self.assignments[submission.assignment_id][1]
+                        for submission in written
+                    },
+                )
+        self.updated += len(updates)
+        self.created += len(creates)
+        return [
+            (submission.student_id, submission.assignment_id) for submission in written
+        ]
@@ -0,0 +1,174 @@
+"""
+StudentAssignment rows for every student of a program
+"""
+
+from django.db import IntegrityError, transaction
+
+from ..models import (
+    Assignment,
+    AssignmentGradeRollup,
+    CourseGradeRollup,
+    Student,
+    StudentAssignment,
+    StudentGradeRollup,
+)
+from . import cache, rollups
+from .rollups import RollupDelta
+
+
+def create_rows(pairs, batch_size):
+    """
+    bulk_create empty StudentAssignment rows for (student_id, assignment_id)
+    pairs; pairs that already have a row are skipped by the unique
+    constraint
+    """
+    with transaction.atomic():
+        StudentAssignment.objects.bulk_create(
+            [
+                StudentAssignment(student_id=student_id, assignment_id=assignment_id)
+                for student_id, assignment_id in pairs
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+
+def insert_rows(pairs, batch_size):
+    """
+    insert empty StudentAssignment rows for (student_id, assignment_id)
+    pairs and return the pairs inserted: all of them, unless a concurrent
+    insert took some, in which case the rows are inserted one at a time and
+    the taken pairs skipped
+    """
+    try:
+        with transaction.atomic():
+            StudentAssignment.objects.bulk_create(
+                [
+                    StudentAssignment(
+                        student_id=student_id, assignment_id=assignment_id
+                    )
+                    for student_id, assignment_id in pairs
+                ],
+                batch_size=batch_size,
+            )
+        return pairs
+    except IntegrityError:
+        pass
+    inserted = []
+    for student_id, assignment_id in pairs:
+        try:
+            with transaction.atomic():
+                StudentAssignment.objects.bulk_create(
+                    [
+                        StudentAssignment(
+                            student_id=student_id, assignment_id=assignment_id
+                        )
+                    ]
+                )
+        except IntegrityError:
+            continue
+        inserted.append((student_id, assignment_id))
+    return inserted
+
+
+def materialize_assignment(assignment, batch_size=2000):
+    """
+    a row for every student of a new assignment's program, batch_size
+    students per transaction; return the number of rows created.
+
+    the new rows are ungraded and unsubmitted, so the rollups only gain a
+    row each: their counts are bumped in place instead of rebuilt, and the
+    students are read in keyset chunks, so no query carries more than
+    batch_size ids.
+    """
+    students = Student.objects.filter(program_id=assignment.program_id).order_by("id")
+    created = last = 0
+    while True:
+        chunk = list(
+            students.filter(id__gt=last).values_list("id", flat=True)[:batch_size]
+        )
+        if not chunk:
+            break
+        last = chunk[-1]
+        with transaction.atomic():
+            existing = set(
+                StudentAssignment.objects.filter(
+                    assignment=assignment, student_id__in=chunk
+                ).values_list("student_id", flat=True)
+            )
+            inserted = [
+                student_id
+                for student_id, _ in insert_rows(
+                    [
+                        (student_id, assignment.pk)
+                        for student_id in chunk
+                        if student_id not in existing
+                    ],
+                    batch_size,
+                )
+            ]
+            # bulk_create sends no signals; only the rows inserted here are
+            # counted, a concurrent insert maintains its own rollups
+            rollups.bump_many(
+                StudentGradeRollup, "student", inserted, RollupDelta(0, 1, 0, 0)
+            )
+        created += len(inserted)
+    delta = RollupDelta(0, created, 0, 0)
+    rollups.bump(AssignmentGradeRollup, "assignment", assignment.pk, delta)
+    rollups.bump(CourseGradeRollup, "course", assignment.course_id, delta)
+    return created
+
+
+def backfill(programs=None, chunk_size=2000, log=None):
+    """
+    create the missing rows of every student and assignment of programs
+    (all by default), chunk_size students at a time; return the number of
+    rows created
+    """
+    log = log or (lambda message: None)
+    assignments = Assignment.objects.order_by("program_id", "id")
+    if programs is not None:
+        assignments = assignments.filter(program__in=programs)
+    by_program = {}
+    for pk, program_id in assignments.values_list("id", "program_id"):
+        by_program.setdefault(program_id, []).append(pk)
+
+    created = 0
+    for program_id, assignment_ids in by_program.items():
+        students = Student.objects.filter(program_id=program_id).order_by("id")
+        last = program_created = 0
+        while True:
+            # keyset chunks, so every chunk is an index range scan
+            chunk = list(
+                students.filter(id__gt=last).values_list("id", flat=True)[:chunk_size]
+            )
+            if not chunk:
+                break
+            last = chunk[-1]
+            existing = set(
+                StudentAssignment.objects.filter(
+                    student_id__in=chunk, assignment_id__in=assignment_ids
+                ).values_list("student_id", "assignment_id")
+            )
+            missing = [
+                (student_id, assignment_id)
+                for student_id in chunk
+                for assignment_id in assignment_ids
+                if (student_id, assignment_id) not in existing
+            ]
+            if missing:
+                create_rows(missing, chunk_size)
+                rollups.rebuild(students=chunk)
+                program_created += len(missing)
+            log(
+                f"program {program_id}: {program_created} rows created up to "
+                f"student {last}"
+            )
+        if program_created:
+            rollups.rebuild(assignments=assignment_ids)
+            created += program_created
+
+    if created:
+        rollups.rebuild(courses=assignments.values("course"))
+        cache.bump()
+    return created
@@ -0,0 +1,76 @@
+"""
+Query plans of the voyage hot filters
+"""
+
+import re
+
+from django.db import connection
+
+from ..models import Assignment, StudentAssignment
+
+
+def fk_index(model, field):
+    """
+    name Django gives the index of a ForeignKey's column
+    """
+    column = model._meta.get_field(field).column
+    # only names the index, so the editor is not entered; entering it is
+    # not allowed inside a transaction on SQLite
+    return connection.schema_editor()._create_index_name(
+        model._meta.db_table, [column], suffix=""
+    )
+
+
+def hot_queries():
+    """
+    {name: (queryset, index)} of the filters models.py and the views issue
+    most, with placeholder ids, and the index each must be served by
+    """
+    submissions = StudentAssignment.objects.all()
+    assignments = Assignment.objects.all()
+    return {
+        "submitted by student": (
+            submissions.filter(student_id=1, submitted__isnull=False),
+            "voyage_sa_submitted",
+        ),
+        "not submitted by student": (
+            submissions.filter(student_id=1, submitted__isnull=True),
+            "voyage_sa_not_submitted",
+        ),
+        # SQLite names the index of the first unique constraint of a table
+        "student assignment": (
+            submissions.filter(student_id=1, assignment_id=1),
+            f"sqlite_autoindex_{StudentAssignment._meta.db_table}_1",
+        ),
+        "graded for assignment": (
+            submissions.filter(assignment_id=1, grade__isnull=False),
+            "voyage_sa_graded",
+        ),
+        "ungraded for assignment": (
+            submissions.filter(assignment_id=1, grade__isnull=True),
+            "voyage_sa_ungraded",
+        ),
+        "graded by reviewer": (
+            submissions.filter(reviewer_id=1, grade__isnull=False),
+            "voyage_sa_reviewer_graded",
+        ),
+        "assignments by course": (
+            assignments.filter(course_id=1),
+            "voyage_asg_course_program",
+        ),
+        "assignments by program": (
+            assignments.filter(program_id=1),
+            fk_index(Assignment, "program"),
+        ),
+        "assignments by course and program": (
+            assignments.filter(course_id=1, program_id=1),
+            "voyage_asg_course_program",
+        ),
+    }
+
+
+def uses_index(plan, index):
+    """
+    whether a query plan searches or scans index
+    """
+    return re.search(rf"\bUSING (?:COVERING )?INDEX {re.escape(index)}\b", plan)
@@ -0,0 +1,142 @@
+"""
+Leaderboards
+"""
+
+from decimal import Decimal
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Max, Sum, Window
+from django.db.models.functions import Cast, DenseRank, Round
+
+from ..models import Course, Leaderboard, LeaderboardEntry, Program, StudentAssignment
+
+CENTS = Decimal("0.01")
+# scope: (model, StudentAssignment path to it)
+SCOPES = {
+    "program": (Program, "assignment__program"),
+    "course": (Course, "assignment__course"),
+}
+
+
+def scope_of(leaderboard):
+    """
+    (scope, id) of a leaderboard
+    """
+    if leaderboard.program_id is not None:
+        return "program", leaderboard.program_id
+    return "course", leaderboard.course_id
+
+
+def standings(scope, scope_id):
+    """
+    (student_id, average, rank) rows of the students of a program or
+    course, ranked in SQL; the average is over all of the student's rows,
+    ungraded rows counting as zero like the grade rollups, rounded to the
+    displayed precision so equal averages share a dense rank
+    """
+    _, path = SCOPES[scope]
+    # a float, so the division is never an integer one
+    average = Round(Cast(Sum("grade", default=0), FloatField()) / Count("id"), 2)
+    return (
+        StudentAssignment.objects.filter(**{path: scope_id})
+        .order_by()
+        .values("student_id")
+        .annotate(
+            average=average,
+            rank=Window(DenseRank(), order_by=F("average").desc()),
+        )
+        .values_list("student_id", "average", "rank")
+    )
+
+
+def fingerprints(scope):
+    """
+    {id: fingerprint} of every program or course with StudentAssignment
+    rows, from one grouped query; any saved, imported, added or deleted
+    row changes it
+    """
+    _, path = SCOPES[scope]
+    rows = (
+        StudentAssignment.objects.order_by()
+        .values(path)
+        .annotate(count=Count("id"), total=Sum("grade"), updated=Max("dtm_updated"))
+        .values_list(path, "count", "total", "updated")
+    )
+    return {
+        scope_id: hashlib.md5(repr(state).encode()).hexdigest()
+        for scope_id, *state in rows
+    }
+
+
+@transaction.atomic
+def refresh(leaderboard, fingerprint=""):
+    """
+    rank the students of a leaderboard's scope and write only the entries
+    that changed; return the number of entries written
+    """
+    rows = {
+        student_id: (Decimal(average).quantize(CENTS), rank)
+        for student_id, average, rank in standings(*scope_of(leaderboard))
+    }
+    existing = {entry.student_id: entry for entry in leaderboard.entries.all()}
+    changed = [
+        entry
+        for student_id, entry in existing.items()
+        if student_id in rows and (entry.average, entry.rank) != rows[student_id]
+    ]
+    removed = [student_id for student_id in existing if student_id not in rows]
+    if len(changed) > len(existing) // 2:
+        # one moved average shifts the rank of everyone below it; a mostly
+        # shifted leaderboard is rewritten faster than updated row by row
+        leaderboard.entries.all().delete()
+        existing, changed, removed = {}, [], []
+
+    for entry in changed:
+        entry.average, entry.rank = rows[entry.student_id]
+    LeaderboardEntry.objects.bulk_update(changed, ["average", "rank"], batch_size=1000)
+    created = LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(
+                leaderboard=leaderboard,
+                student_id=student_id,
+                average=average,
+                rank=rank,
+            )
+            for student_id, (average, rank) in rows.items()
+            if student_id not in existing
+        ],
+        batch_size=1000,
+    )
+    if removed:
+        leaderboard.entries.filter(student_id__in=removed).delete()
+    leaderboard.fingerprint = fingerprint
+    leaderboard.save(update_fields=["fingerprint", "dtm_updated"])
+    return len(changed) + len(created) + len(removed)
+
+
+def refresh_all(force=False, log=None):
+    """
+    refresh the leaderboard of every program and course whose rows changed
+    since its last refresh (all of them with force), creating missing
+    leaderboards; return the number of leaderboards refreshed
+    """
+    log = log or (lambda message: None)
+    refreshed = 0
+    for scope, (model, _) in SCOPES.items():
+        current = fingerprints(scope)
+        boards = {
+            getattr(board, f"{scope}_id"): board
+            for board in Leaderboard.objects.filter(**{f"{scope}__isnull": False})
+        }
+        for scope_id in model.objects.values_list("id", flat=True):
+            fingerprint = current.get(scope_id, "")
+            board = boards.get(scope_id)
+            if board is None:
+                board = Leaderboard.objects.create(**{f"{scope}_id": scope_id})
+            elif board.fingerprint == fingerprint and not force:
+                continue
+            written = refresh(board, fingerprint)
+            refreshed += 1
+            log(f"{scope} {scope_id}: {written} entries written")
+    return refreshed
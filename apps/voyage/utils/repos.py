@@ -0,0 +1,110 @@
+"""
+Student repositories
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import RepoProvisioning, Student, StudentRepo
+
+
+class CloneError(Exception):
+    """
+    git could not clone a repo
+    """
+
+
+def source_url(repo):
+    """
+    where to clone a content repo from: the repo url, or its path under
+    VOYAGE_REPO_MIRROR when a local mirror stands in for the git host
+    """
+    mirror = getattr(settings, "VOYAGE_REPO_MIRROR", None)
+    if not mirror:
+        return repo
+    return os.path.join(mirror, urlparse(repo).path.strip("/"))
+
+
+def student_repo_path(student, assignment):
+    """
+    bare repo of a student's copy of an assignment, under VOYAGE_REPO_ROOT
+    """
+    return os.path.join(
+        settings.VOYAGE_REPO_ROOT,
+        student.github,
+        f"assignment-{assignment.pk}.git",
+    )
+
+
+def clone(source, path, timeout=None):
+    """
+    bare clone source to path; an existing clone at path is kept, so a
+    retried clone after a crash does not fail
+    """
+    if os.path.exists(os.path.join(path, "HEAD")):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # clone next to the destination and rename, so path never holds a
+    # partial clone
+    partial = tempfile.mkdtemp(prefix=".clone-", dir=os.path.dirname(path))
+    try:
+        subprocess.run(
+            ["git", "clone", "--bare", "--quiet", source, partial],
+            capture_output=True,
+            check=True,
+            text=True,
+            timeout=timeout or settings.VOYAGE_REPO_CLONE_TIMEOUT,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+        os.replace(partial, path)
+    except subprocess.CalledProcessError as exc:
+        raise CloneError(exc.stderr.strip() or str(exc)) from exc
+    except subprocess.TimeoutExpired as exc:
+        raise CloneError(f"git clone timed out after {exc.timeout}s") from exc
+    except OSError:
+        # a concurrent run of the same clone may have finished first
+        if not os.path.exists(os.path.join(path, "HEAD")):
+            raise
+    finally:
+        shutil.rmtree(partial, ignore_errors=True)
+    return path
+
+
+def prepare(assignment):
+    """
+    create a pending StudentRepo for every student of the assignment's
+    program, reset its RepoProvisioning and return the ids of the students
+    whose repo is not cloned yet; failed clones of an earlier run are tried
+    again
+    """
+    students = Student.objects.filter(program_id=assignment.program_id)
+    with transaction.atomic():
+        StudentRepo.objects.bulk_create(
+            [
+                StudentRepo(assignment=assignment, student_id=student_id)
+                for student_id in students.values_list("id", flat=True)
+            ],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+        repos = StudentRepo.objects.filter(assignment=assignment)
+        repos.filter(status=StudentRepo.FAILED).update(status=StudentRepo.PENDING)
+        RepoProvisioning.objects.update_or_create(
+            assignment=assignment,
+            defaults={
+                "total": repos.count(),
+                "succeeded": repos.filter(status=StudentRepo.CLONED).count(),
+                "failed": 0,
+            },
+        )
+    return list(
+        repos.exclude(status=StudentRepo.CLONED)
+        .order_by("student_id")
+        .values_list("student_id", flat=True)
+    )
@@ -0,0 +1,157 @@
+"""
+Grade rollups
+"""
+
+from collections import namedtuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from ..models import (
+    AssignmentGradeRollup,
+    CourseGradeRollup,
+    StudentAssignment,
+    StudentGradeRollup,
+)
+
+# (rollup model, rollup key, StudentAssignment path to the key)
+ROLLUPS = (
+    (StudentGradeRollup, "student", "student"),
+    (AssignmentGradeRollup, "assignment", "assignment"),
+    (CourseGradeRollup, "course", "assignment__course"),
+)
+
+
+class RollupDelta(
+    namedtuple("RollupDelta", "grade_sum count graded_count submitted_count")
+):
+    """
+    change to the totals of a rollup
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, grade, submitted, sign=1):
+        """
+        contribution of a single StudentAssignment row
+        """
+        return cls(
+            sign * (grade or 0),
+            sign,
+            sign if grade is not None else 0,
+            sign if submitted is not None else 0,
+        )
+
+    def __add__(self, other):
+        return RollupDelta(*(a + b for a, b in zip(self, other)))
+
+    def __bool__(self):
+        return any(self)
+
+
+def bump(model, key, value, delta):
+    """
+    add delta to the rollup of model keyed by value, creating it if missing
+    """
+    if value is None or not delta:
+        return
+    key = f"{key}_id"
+    changes = {field: F(field) + amount for field, amount in delta._asdict().items()}
+    if model.objects.filter(**{key: value}).update(**changes):
+        return
+    if delta.count <= 0:
+        # nothing to subtract from; the rollup has been or is being deleted
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**{key: value}, **delta._asdict())
+    except IntegrityError:
+        model.objects.filter(**{key: value}).update(**changes)
+
+
+def bump_many(model, key, values, delta):
+    """
+    add delta to the rollups of model keyed by values in one UPDATE,
+    creating the missing ones
+    """
+    if not values or not delta:
+        return
+    key = f"{key}_id"
+    rollups = model.objects.filter(**{f"{key}__in": values})
+    rollups.update(
+        **{field: F(field) + amount for field, amount in delta._asdict().items()}
+    )
+    if delta.count <= 0:
+        return
+    present = set(rollups.values_list(key, flat=True))
+    model.objects.bulk_create(
+        [
+            model(**{key: value}, **delta._asdict())
+            for value in values
+            if value not in present
+        ],
+        batch_size=2000,
+        ignore_conflicts=True,
+    )
+
+
+def apply(previous, current):
+    """
+    move the contribution of a StudentAssignment row from previous to current.
+
+    both are (student_id, assignment_id, course_id, grade, submitted) tuples,
+    or None for a row that did not exist before or no longer exists.
+    """
+    deltas = {}
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None:
+            continue
+        *keys, grade, submitted = state
+        delta = RollupDelta.of(grade, submitted, sign)
+        for (model, key, _), value in zip(ROLLUPS, keys):
+            deltas[model, key, value] = (
+                deltas.get((model, key, value), RollupDelta(0, 0, 0, 0)) + delta
+            )
+    for (model, key, value), delta in deltas.items():
+        bump(model, key, value, delta)
+
+
+@transaction.atomic
+def rebuild(students=None, assignments=None, courses=None):
+    """
+    recompute rollups from StudentAssignment rows.
+
+    students, assignments and courses limit the rebuild to those rollups and
+    may be querysets, instances or ids; with no arguments every rollup is
+    rebuilt.
+    """
+    scopes = (students, assignments, courses)
+    rebuild_all = all(scope is None for scope in scopes)
+    for (model, key, path), scope in zip(ROLLUPS, scopes):
+        if scope is None and not rebuild_all:
+            continue
+        rollups = model.objects.all()
+        rows = StudentAssignment.objects.all()
+        if scope is not None:
+            rollups = rollups.filter(**{f"{key}__in": scope})
+            rows = rows.filter(**{f"{path}__in": scope})
+        rollups.delete()
+        totals = (
+            rows.order_by()
+            .values(path)
+            .annotate(
+                grade_sum=Sum("grade", default=0),
+                count=Count("id"),
+                graded_count=Count("grade"),
+                submitted_count=Count("submitted"),
+            )
+            .values_list(path, "grade_sum", "count", "graded_count", "submitted_count")
+        )
+        model.objects.bulk_create(
+            [
+                model(**{f"{key}_id": value}, **RollupDelta(*values)._asdict())
+                for value, *values in totals
+            ],
+            batch_size=2000,
+        )
@@ -0,0 +1,295 @@
+"""
+Bulk synthetic data
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from ..models import (
+    Assignment,
+    Content,
+    Course,
+    Faculty,
+    Program,
+    Student,
+    StudentAssignment,
+)
+from . import cache, edges, rollups
+
+# dates of seeded runs are relative to this instead of the wall clock, so a
+# seed produces the same data on any day
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def chunked(iterable, size):
+    """
+    yield lists of up to size items from iterable
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Seeder:
+    """
+    generate voyage data in batched bulk_create chunks.
+
+    rows are produced by generators and written batch_size at a time, so
+    memory stays bounded by the batch size rather than the row count. the
+    same seed on an empty database produces the same data: dates are
+    relative to now, which defaults to EPOCH for a seeded run and to the
+    current time otherwise.
+    """
+
+    def __init__(
+        self, seed=None, batch_size=5000, password="voyage", log=None, now=None
+    ):
+        self.random = random.Random(seed)
+        self.fake = Faker()
+        self.fake.seed_instance(seed)
+        self.batch_size = batch_size
+        self.password = make_password(password)
+        self.log = log or (lambda message: None)
+        if now is None:
+            now = EPOCH if seed is not None else timezone.now()
+        self.now = now
+        self.feedback = [self.fake.paragraph() for _ in range(64)]
+
+    def offset(self, model):
+        """
+        first free suffix for generated unique names of model
+        """
+        return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+    def save(self, model, rows, unique_field=None):
+        """
+        bulk_create rows in batches and return them with primary keys set
+        """
+        saved = []
+        for batch in chunked(rows, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            if batch[0].pk is None and unique_field:
+                # backends that cannot return ids from bulk inserts (MySQL)
+                ids = dict(
+                    model.objects.filter(
+                        **{
+                            f"{unique_field}__in": [
+                                getattr(row, unique_field) for row in batch
+                            ]
+                        }
+                    ).values_list(unique_field, "id")
+                )
+                for row in batch:
+                    row.pk = ids[getattr(row, unique_field)]
+            saved.extend(batch)
+        return saved
+
+    def users(self, prefix, count, offset):
+        """
+        users sharing one precomputed password hash
+        """
+        user_model = get_user_model()
+        for number in range(offset, offset + count):
+            username = f"{prefix}-{number}"
+            yield user_model(
+                username=username,
+                email=f"{username}@example.com",
+                password=self.password,
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+            )
+
+    def create_faculty(self, count):
+        """
+        faculty and their users
+        """
+        offset = self.offset(Faculty)
+        users = self.save(
+            get_user_model(), self.users("faculty", count, offset), "username"
+        )
+        faculty = (
+            Faculty(user=user, github=user.username, is_active=True) for user in users
+        )
+        return self.save(Faculty, faculty, "github")
+
+    def create_programs(self, count):
+        """
+        programs with a start within the last year
+        """
+        offset = self.offset(Program)
+        programs = []
+        for number in range(offset, offset + count):
+            start = self.now - timedelta(days=self.random.randint(0, 365))
+            end = start + timedelta(days=30 * self.random.randint(1, 12))
+            programs.append(Program(name=f"Cohort-{number}", start=start, end=end))
+        return self.save(Program, programs, "name")
+
+    def create_courses(self, count):
+        """
+        courses with unique names
+        """
+        offset = self.offset(Course)
+        courses = (
+            Course(name=f"{self.fake.word().title()} {number}")
+            for number in range(offset, offset + count)
+        )
+        return self.save(Course, courses, "name")
+
+    def create_content(self, count, faculty):
+        """
+        content repos owned by random faculty
+        """
+        offset = self.offset(Content)
+        content = (
+            Content(
+                name=self.fake.catch_phrase(),
+                faculty=self.random.choice(faculty),
+                repo=f"https://github.com/voyage-seed/content-{number}",
+            )
+            for number in range(offset, offset + count)
+        )
+        return self.save(Content, content, "repo")
+
+    def create_assignments(self, per_program, programs, courses, content):
+        """
+        per_program assignments in each program, each on distinct content
+        """
+        assignments = []
+        for program in programs:
+            picked = self.random.sample(content, min(per_program, len(content)))
+            for index, item in enumerate(picked):
+                assignments.append(
+                    Assignment(
+                        program=program,
+                        course=courses[index % len(courses)],
+                        content=item,
+                        due=self.now + timedelta(days=self.random.randint(-30, 30)),
+                        instructions=self.fake.paragraph(),
+                        rubric=self.fake.paragraph(),
+                    )
+                )
+        return self.save(Assignment, assignments)
+
+    def create_students(self, count, programs):
+        """
+        yield batches of students, spread over programs, with their users
+        """
+        offset = self.offset(Student)
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            users = self.save(
+                get_user_model(),
+                self.users("student", size, offset + start),
+                "username",
+            )
+            students = (
+                Student(
+                    user=user,
+                    github=user.username,
+                    program=self.random.choice(programs),
+                    is_active=True,
+                )
+                for user in users
+            )
+            yield self.save(Student, students, "github")
+
+    def submissions(self, students, per_student, extra, assignments, faculty):
+        """
+        StudentAssignment rows for a batch of students.
+
+        each student gets per_student distinct assignments of their program,
+        and the first extra students of the batch one more.
+        """
+        for index, student in enumerate(students):
+            choices = assignments[student.program_id]
+            wanted = per_student + (1 if index < extra else 0)
+            for assignment_id in self.random.sample(choices, min(wanted, len(choices))):
+                submitted = reviewed = grade = reviewer = feedback = None
+                if self.random.random() < 0.85:
+                    submitted = self.now - timedelta(
+                        minutes=self.random.randint(0, 60 * 24 * 30)
+                    )
+                    if self.random.random() < 0.8:
+                        grade = round(self.random.uniform(0, 100), 2)
+                        reviewed = submitted + timedelta(
+                            minutes=self.random.randint(1, 60 * 24 * 7)
+                        )
+                        reviewer = self.random.choice(faculty)
+                        feedback = self.random.choice(self.feedback)
+                yield StudentAssignment(
+                    student_id=student.pk,
+                    assignment_id=assignment_id,
+                    grade=grade,
+                    submitted=submitted,
+                    reviewed=reviewed,
+                    reviewer=reviewer,
+                    feedback=feedback,
+                )
+
+    def run(
+        self,
+        faculty=5,
+        programs=3,
+        courses=3,
+        content=28,
+        assignments=5,
+        students=10,
+        submissions=45,
+    ):
+        """
+        generate a complete data set and rebuild derived tables
+        """
+        faculty = self.create_faculty(faculty)
+        programs = self.create_programs(programs)
+        courses = self.create_courses(courses)
+        content = self.create_content(max(content, assignments), faculty)
+        created = self.create_assignments(assignments, programs, courses, content)
+        self.log(
+            f"{len(faculty)} faculty, {len(programs)} programs, {len(courses)} "
+            f"courses, {len(content)} content, {len(created)} assignments"
+        )
+
+        by_program = {program.pk: [] for program in programs}
+        for pk, program_id in Assignment.objects.filter(
+            program__in=programs
+        ).values_list("id", "program_id"):
+            by_program[program_id].append(pk)
+
+        per_student, extra = divmod(submissions, max(students, 1))
+        if per_student >= assignments:
+            per_student, extra = assignments, 0
+        total_students = total_submissions = 0
+        for batch in self.create_students(students, programs):
+            # the remainder goes to the first students overall
+            batch_extra = max(0, min(extra - total_students, len(batch)))
+            rows = self.submissions(
+                batch, per_student, batch_extra, by_program, faculty
+            )
+            for chunk in chunked(rows, self.batch_size):
+                with transaction.atomic():
+                    StudentAssignment.objects.bulk_create(chunk)
+                total_submissions += len(chunk)
+            total_students += len(batch)
+            self.log(f"{total_students} students, {total_submissions} submissions")
+
+        rollups.rebuild()
+        edges.rebuild()
+        cache.bump()
+        return {
+            "faculty": len(faculty),
+            "programs": len(programs),
+            "courses": len(courses),
+            "content": len(content),
+            "assignments": len(created),
+            "students": total_students,
+            "submissions": total_submissions,
+        }
@@ -0,0 +1,317 @@
+"""
+API views
+"""
+
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max, Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from apps.voyage.models import (
+    Assignment,
+    Course,
+    Leaderboard,
+    Program,
+    Student,
+    StudentAssignment,
+)
+from ..serializers import (
+    AssignmentSerializer,
+    CourseSerializer,
+    ProgramSerializer,
+    StudentSerializer,
+    SubmissionSerializer,
+)
+from ..utils import history
+from ..utils.analytics import cohort_statistics
+from .shared import ReplicaReadMixin
+
+
+MAX_LEADERBOARD_TOP = 500
+
+
+def leaderboard_entry(entry):
+    """
+    a LeaderboardEntry as a dict
+    """
+    return {
+        "rank": entry.rank,
+        "student": entry.student_id,
+        "github": entry.student.github,
+        "average": entry.average,
+    }
+
+
+class VoyageCursorPagination(CursorPagination):
+    """
+    keyset pages ordered by id, so inserts never shift a page and no page
+    needs an OFFSET scan
+    """
+
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+def queryset_etag(queryset, related, *extra):
+    """
+    strong ETag of the rows of queryset and their related rows, from one
+    aggregate of row counts and latest dtm_updated
+    """
+    aggregates = {
+        "count": Count("pk", distinct=bool(related)),
+        "updated": Max("dtm_updated"),
+    }
+    for path in related:
+        aggregates[f"{path}_count"] = Count(f"{path}__pk", distinct=True)
+        aggregates[f"{path}_updated"] = Max(f"{path}__dtm_updated")
+    values = queryset.order_by().aggregate(**aggregates)
+    state = repr((sorted(values.items()), extra))
+    return quote_etag(hashlib.md5(state.encode()).hexdigest())
+
+
+class VoyageReadOnlyViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    read only viewset with cursor pagination, ?<filter>=<id> filters and
+    ETag/If-None-Match, reading from the replica when one is configured.
+
+    - filters: query parameter to model field of allowed equality filters
+    - etag_related: relations whose rows the serializer reads, so their
+      changes change the ETag
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = VoyageCursorPagination
+    filters = {}
+    etag_related = ()
+
+    def filter_queryset(self, queryset):
+        """
+        apply the equality filters present in the query string
+        """
+        queryset = super().filter_queryset(queryset)
+        lookups = {
+            field: self.request.query_params[param]
+            for param, field in self.filters.items()
+            if param in self.request.query_params
+        }
+        try:
+            return queryset.filter(**lookups)
+        except (TypeError, ValueError, DjangoValidationError) as exc:
+            raise ValidationError({"filters": str(exc)}) from exc
+
+    def conditional(self, queryset, respond, request, *args, **kwargs):
+        """
+        304 if the client's ETag of queryset is current, else the response
+        of respond(request, *args, **kwargs) with the ETag
+        """
+        etag = queryset_etag(
+            queryset, self.etag_related, request.get_full_path(), self.action
+        )
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response = respond(request, *args, **kwargs)
+        response["ETag"] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        over-riding
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(queryset, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        over-riding
+        """
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(pk=kwargs[lookup])
+        except (TypeError, ValueError) as exc:
+            raise NotFound from exc
+        return self.conditional(queryset, super().retrieve, request, *args, **kwargs)
+
+
+def point_in_time(request):
+    """
+    aware datetime of ?at=, now when absent
+    """
+    value = request.query_params.get("at")
+    if value is None:
+        return timezone.now()
+    try:
+        at = parse_datetime(value)
+    except ValueError:
+        at = None
+    if at is None:
+        raise ValidationError({"at": f"invalid datetime {value!r}"})
+    if timezone.is_naive(at):
+        at = timezone.make_aware(at)
+    return at
+
+
+class CohortMixin:
+    """
+    <id>/statistics/, <id>/leaderboard/ and <id>/history/ of a program or
+    course.
+
+    - cohort_scope: "program" or "course", the scope the object fills
+    """
+
+    cohort_scope = None
+
+    @action(detail=True)
+    def statistics(self, request, *args, **kwargs):
+        """
+        mean, median, stddev, percentiles, histogram and per-assignment
+        statistics of the object's grades
+        """
+        cohort = self.get_object()
+        return Response(cohort_statistics(**{self.cohort_scope: cohort.pk}))
+
+    @action(detail=True)
+    def leaderboard(self, request, *args, **kwargs):
+        """
+        ?top=<n> best ranked students (10 by default) and, with
+        ?student=<id>, that student's rank, from the last refresh
+        """
+        cohort = self.get_object()
+        try:
+            top = min(int(request.query_params.get("top", 10)), MAX_LEADERBOARD_TOP)
+            student = request.query_params.get("student")
+            student = int(student) if student is not None else None
+        except ValueError as exc:
+            raise ValidationError({"leaderboard": str(exc)}) from exc
+        board = Leaderboard.objects.filter(**{self.cohort_scope: cohort}).first()
+        if board is None:
+            return Response({"refreshed": None, "top": [], "student": None})
+        entry = board.rank_of(student) if student is not None else None
+        return Response(
+            {
+                "refreshed": board.dtm_updated,
+                "top": [leaderboard_entry(row) for row in board.top(max(top, 0))],
+                "student": leaderboard_entry(entry) if entry else None,
+            }
+        )
+
+    @action(detail=True)
+    def history(self, request, *args, **kwargs):
+        """
+        average grade of the object as it stood ?at=<datetime> (now by
+        default), from the latest snapshot before then and the grade events
+        since, or from the live grades before the first snapshot
+        """
+        cohort = self.get_object()
+        at = point_in_time(request)
+        state = history.average_at(at, **{self.cohort_scope: cohort.pk})
+        return Response({"at": at, **state})
+
+
+class ProgramViewSet(CohortMixin, VoyageReadOnlyViewSet):
+    """
+    Programs
+    """
+
+    queryset = Program.objects.all()
+    serializer_class = ProgramSerializer
+    cohort_scope = "program"
+
+
+class CourseViewSet(CohortMixin, VoyageReadOnlyViewSet):
+    """
+    Courses
+    """
+
+    queryset = Course.objects.prefetch_related(
+        Prefetch("assignment_set", queryset=Assignment.objects.only("id", "course"))
+    )
+    serializer_class = CourseSerializer
+    etag_related = ("assignment",)
+    cohort_scope = "course"
+
+    def filter_queryset(self, queryset):
+        """
+        ?program=<id> as a semi-join, so courses do not repeat per assignment
+        """
+        queryset = super().filter_queryset(queryset)
+        if "program" not in self.request.query_params:
+            return queryset
+        try:
+            return queryset.filter(
+                id__in=Assignment.objects.filter(
+                    program=self.request.query_params["program"]
+                ).values("course")
+            )
+        except (TypeError, ValueError) as exc:
+            raise ValidationError({"filters": str(exc)}) from exc
+
+
+class StudentViewSet(VoyageReadOnlyViewSet):
+    """
+    Students
+    """
+
+    queryset = Student.objects.select_related("program")
+    serializer_class = StudentSerializer
+    filters = {"program": "program", "github": "github"}
+    etag_related = ("program",)
+
+    @action(detail=True)
+    def trajectory(self, request, *args, **kwargs):
+        """
+        every grade change of the student, oldest first, optionally of one
+        ?assignment=<id>
+        """
+        student = self.get_object()
+        assignment = request.query_params.get("assignment")
+        try:
+            events = history.trajectory(student, assignment=assignment)
+            return Response(
+                [
+                    {
+                        "recorded": recorded,
+                        "assignment": assignment_id,
+                        "previous": previous,
+                        "grade": grade,
+                    }
+                    for recorded, assignment_id, previous, grade in events
+                ]
+            )
+        except (TypeError, ValueError) as exc:
+            raise ValidationError({"assignment": str(exc)}) from exc
+
+
+class AssignmentViewSet(VoyageReadOnlyViewSet):
+    """
+    Assignments
+    """
+
+    queryset = Assignment.objects.select_related("content")
+    serializer_class = AssignmentSerializer
+    filters = {"program": "program", "course": "course", "content": "content"}
+    etag_related = ("content",)
+
+
+class SubmissionViewSet(VoyageReadOnlyViewSet):
+    """
+    StudentAssignments
+    """
+
+    queryset = StudentAssignment.objects.all()
+    serializer_class = SubmissionSerializer
+    filters = {
+        "student": "student",
+        "assignment": "assignment",
+        "reviewer": "reviewer",
+        "status": "status",
+    }
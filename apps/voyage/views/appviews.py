@@ -2,12 +2,30 @@
 Views
 """
 
+import io
+import tempfile
+
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.db import router, transaction
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.views import View
 from django.views.generic import ListView, TemplateView
-from django.core.exceptions import ObjectDoesNotExist
-from apps.voyage.models import Faculty, Student
-from ..forms import CourseForm, AssignmentForm
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from apps.voyage.models import Faculty, RepoProvisioning, Student, StudentAssignment
+from ..forms import CourseForm, AssignmentForm, GradebookImportForm
+from ..tasks import provision_assignment_repos
+from ..utils.dashboard import course_table
+from ..utils.export import csv_lines, gradebook_rows, write_parquet
+from ..utils.importer import GradebookImport, RowError
+from .shared import KeysetListMixin, ReplicaReadMixin, pin_primary
 from qux.seo.mixin import SEOMixin
 
 
@@ -19,13 +37,19 @@ class VoyageDefaultView(SEOMixin, ListView):
     template_name = "voyage/index.html"
 
 
-class FacultyHomeView(ListView):
+class FacultyHomeView(ReplicaReadMixin, KeysetListMixin, ListView):
     """
     FacultyHomeView
     """
 
     template_name = "voyage/home.html"
-    model = Faculty
+    queryset = Faculty.objects.select_related("user")
+    search_fields = (
+        "user__username",
+        "user__first_name",
+        "user__last_name",
+        "github",
+    )
 
     def get_context_data(self, **kwargs):
         """
@@ -38,13 +62,19 @@ class FacultyHomeView(ListView):
         return context
 
 
-class StudentHomeview(ListView):
+class StudentHomeview(ReplicaReadMixin, KeysetListMixin, ListView):
     """
     StudentHomeview
     """
 
     template_name = "voyage/home.html"
-    model = Student
+    queryset = Student.objects.select_related("user")
+    search_fields = (
+        "user__username",
+        "user__first_name",
+        "user__last_name",
+        "github",
+    )
 
     def get_context_data(self, **kwargs):
         """
@@ -57,7 +87,7 @@ class StudentHomeview(ListView):
         return context
 
 
-class FacultyDashboardView(ListView):
+class FacultyDashboardView(ReplicaReadMixin, ListView):
     """
     FacultyDashboardView
     """
@@ -76,12 +106,12 @@ class FacultyDashboardView(ListView):
         except ObjectDoesNotExist:
             context["error_message"] = "Faculty Does not exist"
             return context
-        context["courses"] = faculty.courses()
+        context["course_table"] = course_table(faculty, faculty.courses())
         context["designation"] = "faculty"
         return context
 
 
-class StudentDashboardView(ListView):
+class StudentDashboardView(ReplicaReadMixin, ListView):
     """
     StudentDashboardView
     """
@@ -100,12 +130,14 @@ class StudentDashboardView(ListView):
         except ObjectDoesNotExist:
             context["error_message"] = "Student Does not exist"
             return context
-        context["courses"] = student.courses()
+        context["course_table"] = course_table(
+            student, student.courses(), students=False
+        )
         context["student_id"] = student_id
         return context
 
 
-class StudentAssignmentView(ListView):
+class StudentAssignmentView(ReplicaReadMixin, ListView):
     """
     StudentAssignmentView
     """
@@ -123,15 +155,16 @@ class StudentAssignmentView(ListView):
             student = self.model.objects.get(id=student_id)
         except ObjectDoesNotExist:
             context["error_message"] = "Student Does Not exist"
+            return context
 
-        assignments = student.assignments()
+        assignments = student.assignments().select_related("content")
         context["headers"] = ["Assignments", "Grade"]
         context["assignments"] = student.get_grade(assignments)
         context["student_id"] = student_id
         return context
 
 
-class StudentSubmittedAssignmentsView(ListView):
+class StudentSubmittedAssignmentsView(ReplicaReadMixin, ListView):
     """
     StudentSubmittedAssignmentsView
     """
@@ -149,8 +182,11 @@ class StudentSubmittedAssignmentsView(ListView):
             student = self.model.objects.get(id=student_id)
         except ObjectDoesNotExist:
             context["error_message"] = "Student Does Not exist"
+            return context
 
-        submitted_assignments = student.assignments_submitted()
+        submitted_assignments = student.assignments_submitted().select_related(
+            "assignment__content"
+        )
         context["headers"] = ["Assignments", "No of Submissions"]
         context["assignments"] = student.find_total_submissions(submitted_assignments)
         context["student_id"] = student_id
@@ -183,7 +219,7 @@ class CreateNewCourse(TemplateView):
         form = context["form"]
         if form.is_valid():
             form.save()
-            return redirect("faculty_home")
+            return pin_primary(redirect("faculty_home"))
         return self.render_to_response(self.get_context_data(form=form))
 
 
@@ -212,6 +248,130 @@ class CreateNewAssignment(TemplateView):
         context = self.get_context_data()
         form = context["form"]
         if form.is_valid():
-            form.save()
-            return redirect(reverse_lazy("faculty_home"))
+            assignment = form.save()
+            # clone the content repo for every student of the program in
+            # the background
+            transaction.on_commit(
+                lambda: provision_assignment_repos.delay(assignment.pk)
+            )
+            return pin_primary(redirect(reverse_lazy("faculty_home")))
         return self.render_to_response(self.get_context_data(form=form))
+
+
+class GradebookExportView(PermissionRequiredMixin, ReplicaReadMixin, View):
+    """
+    GradebookExportView
+
+    ?program=<id>&course=<id>&format=csv|parquet
+
+    holds every student's grades and feedback, so it needs the permission
+    of the import; users without it get a 403
+    """
+
+    chunk_size = 2000
+    permission_required = "voyage.change_studentassignment"
+
+    def get(self, request, *args, **kwargs):
+        """
+        stream the gradebook
+        """
+        export_format = request.GET.get("format", "csv")
+        if export_format not in ("csv", "parquet"):
+            return HttpResponseBadRequest("format must be csv or parquet")
+        try:
+            program = int(request.GET["program"]) if "program" in request.GET else None
+            course = int(request.GET["course"]) if "course" in request.GET else None
+        except ValueError:
+            return HttpResponseBadRequest("program and course must be ids")
+
+        # the rows are read while the response streams, after dispatch, so
+        # bind them to the database chosen now
+        rows = gradebook_rows(
+            program=program,
+            course=course,
+            chunk_size=self.chunk_size,
+            using=router.db_for_read(StudentAssignment),
+        )
+        if export_format == "csv":
+            response = StreamingHttpResponse(csv_lines(rows), content_type="text/csv")
+            response["Content-Disposition"] = 'attachment; filename="gradebook.csv"'
+            return response
+
+        # parquet needs its footer written last, so spool to a temporary file
+        # in row groups and stream the file
+        spool = tempfile.TemporaryFile()
+        try:
+            write_parquet(rows, spool)
+        except ImproperlyConfigured as exc:
+            spool.close()
+            return HttpResponse(str(exc), status=501, content_type="text/plain")
+        spool.seek(0)
+        return FileResponse(
+            spool,
+            as_attachment=True,
+            filename="gradebook.parquet",
+            content_type="application/vnd.apache.parquet",
+        )
+
+
+class GradebookImportView(PermissionRequiredMixin, TemplateView):
+    """
+    GradebookImportView
+
+    overwrites grades, feedback and reviewers, so it needs the permission
+    the admin grading view checks; users without it get a 403
+    """
+
+    template_name = "voyage/gradebook-import.html"
+    form_class = GradebookImportForm
+    permission_required = "voyage.change_studentassignment"
+
+    def get_context_data(self, **kwargs):
+        """
+        over-riding
+        """
+        context = super().get_context_data(**kwargs)
+        context["form"] = self.form_class(
+            self.request.POST or None, self.request.FILES or None
+        )
+        context["heading"] = "Grades"
+        context["designation"] = "faculty"
+        return context
+
+    def post(self, request, *args, **kwargs):
+        """
+        import the uploaded CSV and show the counts and row errors
+        """
+        context = self.get_context_data()
+        form = context["form"]
+        if form.is_valid():
+            result = GradebookImport(batch_size=form.cleaned_data["batch_size"])
+            lines = io.TextIOWrapper(
+                form.cleaned_data["file"].file, encoding="utf-8-sig", newline=""
+            )
+            try:
+                context["result"] = result.run(lines)
+            except UnicodeDecodeError:
+                result.errors.append(RowError(None, "file is not UTF-8 text"))
+                context["result"] = result
+        return self.render_to_response(context)
+
+
+class AssignmentProvisioningView(View):
+    """
+    AssignmentProvisioningView
+
+    progress of cloning an assignment's repo for its students, as JSON
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        counts of the assignment's RepoProvisioning
+        """
+        try:
+            provisioning = RepoProvisioning.objects.get(
+                assignment_id=self.kwargs["assignment_id"]
+            )
+        except ObjectDoesNotExist:
+            return JsonResponse({"error": "Provisioning does not exist"}, status=404)
+        return JsonResponse(provisioning.progress())
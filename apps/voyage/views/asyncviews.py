@@ -0,0 +1,168 @@
+"""
+Async views
+"""
+
+import asyncio
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.shortcuts import render
+from django.views import View
+
+from apps.voyage.models import Faculty, Student, StudentGradeRollup
+from ..utils.cache import aget_or_compute, aversioned_key
+from ..utils.dashboard import acourse_table, cache_name
+from ..utils.gradebook import Gradebook
+from .shared import ReplicaReadMixin
+
+
+async def summary(owner, aggregates):
+    """
+    {label: value} of aggregates, a {label: coroutine function} run
+    concurrently, cached per owner in the current generation
+    """
+
+    async def compute():
+        values = await asyncio.gather(
+            *(aggregate() for aggregate in aggregates.values())
+        )
+        return dict(zip(aggregates, values))
+
+    return await aget_or_compute(
+        await aversioned_key("dashboard", cache_name(owner), "summary"), compute
+    )
+
+
+async def average_grade(student):
+    """
+    average grade of a student from the rollup, or None
+    """
+    rollup = await StudentGradeRollup.objects.filter(student=student).afirst()
+    return rollup.average() if rollup else None
+
+
+class AsyncFacultyDashboardView(ReplicaReadMixin, View):
+    """
+    AsyncFacultyDashboardView
+
+    FacultyDashboardView on the async ORM, for ASGI workers
+    """
+
+    template_name = "voyage/dashboard.html"
+
+    async def get(self, request, *args, **kwargs):
+        """
+        course table and totals of a faculty, fetched concurrently
+        """
+        try:
+            faculty = await Faculty.objects.aget(id=self.kwargs["faculty_id"])
+        except ObjectDoesNotExist:
+            return render(
+                request,
+                self.template_name,
+                {"error_message": "Faculty Does not exist", "designation": "faculty"},
+            )
+
+        course_table, totals = await asyncio.gather(
+            acourse_table(faculty, faculty.courses()),
+            summary(
+                faculty,
+                {
+                    "Courses": faculty.courses().acount,
+                    "Assignments": faculty.num_assignments().acount,
+                    "Graded submissions": faculty.assignments_graded().acount,
+                },
+            ),
+        )
+        context = {
+            "course_table": course_table,
+            "summary": totals,
+            "designation": "faculty",
+        }
+        return render(request, self.template_name, context)
+
+
+class AsyncStudentDashboardView(ReplicaReadMixin, View):
+    """
+    AsyncStudentDashboardView
+
+    StudentDashboardView on the async ORM, for ASGI workers
+    """
+
+    template_name = "voyage/dashboard.html"
+
+    async def get(self, request, *args, **kwargs):
+        """
+        course table and totals of a student, fetched concurrently
+        """
+        student_id = self.kwargs["student_id"]
+        try:
+            student = await Student.objects.aget(id=student_id)
+        except ObjectDoesNotExist:
+            return render(
+                request,
+                self.template_name,
+                {"error_message": "Student Does not exist", "student_id": student_id},
+            )
+
+        course_table, totals = await asyncio.gather(
+            acourse_table(student, student.courses(), students=False),
+            summary(
+                student,
+                {
+                    "Courses": student.courses().acount,
+                    "Submitted": student.assignments_submitted().acount,
+                    "Average grade": lambda: average_grade(student),
+                },
+            ),
+        )
+        context = {
+            "course_table": course_table,
+            "summary": totals,
+            "student_id": student_id,
+        }
+        return render(request, self.template_name, context)
+
+
+class AsyncStudentAssignmentView(ReplicaReadMixin, View):
+    """
+    AsyncStudentAssignmentView
+
+    StudentAssignmentView on the async ORM, for ASGI workers
+    """
+
+    template_name = "voyage/student-assignments.html"
+
+    async def get(self, request, *args, **kwargs):
+        """
+        assignments and grades of a student, fetched concurrently
+        """
+        student_id = self.kwargs["student_id"]
+        try:
+            student = await Student.objects.aget(id=student_id)
+        except ObjectDoesNotExist:
+            return render(
+                request,
+                self.template_name,
+                {"error_message": "Student Does Not exist", "student_id": student_id},
+            )
+
+        assignments, gradebook = await asyncio.gather(
+            self.alist(student.assignments().select_related("content")),
+            Gradebook.afor_students([student.pk]),
+        )
+        context = {
+            "headers": ["Assignments", "Grade"],
+            "assignments": {
+                assignment: gradebook.average(student.pk, assignment.pk)
+                for assignment in assignments
+            },
+            "student_id": student_id,
+        }
+        return render(request, self.template_name, context)
+
+    @staticmethod
+    async def alist(queryset):
+        """
+        rows of queryset, read with async iteration
+        """
+        return [row async for row in queryset]
@@ -0,0 +1,117 @@
+"""
+Shared views
+"""
+
+from django.conf import settings
+from django.db.models import Q
+
+from project.routers import replica_configured, replica_reads
+
+# set on a client that just wrote, to keep its reads on the primary
+PRIMARY_COOKIE = "voyage_primary"
+
+
+def reads_from_replica(request):
+    """
+    whether request may read from the replica: a configured replica, a
+    safe method and no recent write by the client
+    """
+    return (
+        replica_configured()
+        and request.method in ("GET", "HEAD")
+        and PRIMARY_COOKIE not in request.COOKIES
+    )
+
+
+def pin_primary(response):
+    """
+    keep the client's reads on the primary for DB_REPLICA_PIN_SECONDS, so
+    the page after a write shows it; return response
+    """
+    if replica_configured():
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            "1",
+            max_age=settings.DB_REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+class ReplicaReadMixin:
+    """
+    View mixin for read-only views: GET and HEAD requests read from the
+    replica, when one is configured, rendering included; see
+    project.routers
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        over-riding
+        """
+        if not reads_from_replica(request):
+            return super().dispatch(request, *args, **kwargs)
+        if getattr(self, "view_is_async", False):
+            return self.adispatch_replica(request, *args, **kwargs)
+        with replica_reads():
+            return self.rendered(super().dispatch(request, *args, **kwargs))
+
+    async def adispatch_replica(self, request, *args, **kwargs):
+        """
+        dispatch of async views, awaited inside replica_reads()
+        """
+        with replica_reads():
+            return self.rendered(await super().dispatch(request, *args, **kwargs))
+
+    @staticmethod
+    def rendered(response):
+        """
+        response with its template rendered now, while reads still go to
+        the replica
+        """
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+        return response
+
+
+class KeysetListMixin:
+    """
+    ListView mixin that pages by id with ?after=<id> instead of an OFFSET,
+    so every page is an index range scan however deep it is, and searches
+    search_fields with ?q=.
+
+    - page_size: rows per page
+    - search_fields: fields matched case-insensitively by ?q=
+    """
+
+    page_size = 50
+    search_fields = ()
+
+    def get_queryset(self):
+        """
+        over-riding
+        """
+        queryset = super().get_queryset().order_by("id")
+        query = self.request.GET.get("q", "").strip()
+        if query:
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{f"{field}__icontains": query})
+            queryset = queryset.filter(condition)
+        after = self.request.GET.get("after", "")
+        if after.isdigit():
+            queryset = queryset.filter(id__gt=int(after))
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        """
+        over-riding; one extra row tells whether there is a next page
+        """
+        rows = list(self.object_list[: self.page_size + 1])
+        page = rows[: self.page_size]
+        context = super().get_context_data(object_list=page, **kwargs)
+        context["query"] = self.request.GET.get("q", "").strip()
+        context["next_after"] = page[-1].id if len(rows) > self.page_size else None
+        context["is_first_page"] = not self.request.GET.get("after", "").isdigit()
+        return context
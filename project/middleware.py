@@ -0,0 +1,157 @@
+"""
+Per-request SQL instrumentation
+"""
+
+from collections import Counter
+from contextlib import ExitStack
+import logging
+import random
+import re
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import FileResponse
+
+logger = logging.getLogger("project.sql")
+
+IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    sql with literals and IN lists normalized, so repeats of the same query
+    with different parameters compare equal
+    """
+    sql = IN_LIST.sub("(...)", sql)
+    sql = STRING.sub("?", sql)
+    sql = NUMBER.sub("?", sql)
+    return SPACE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """
+    execute_wrapper that counts and times queries by fingerprint
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        """
+        fingerprints issued more than threshold times, most frequent first
+        """
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common()
+            if count > threshold
+        ]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    record query count, DB time and repeated queries for a sample of
+    requests, and log likely N+1 patterns with the view name.
+
+    the totals also go out in a Server-Timing header, to staff users or with
+    DEBUG only. the queries of a streamed response (the gradebook export)
+    run while it is sent, so they are logged once the stream is exhausted;
+    its header, sent first, counts the queries made before streaming.
+
+    settings:
+    - SQL_INSTRUMENTATION: enable; when off the middleware removes itself
+    - SQL_INSTRUMENTATION_SAMPLE_RATE: fraction of requests to instrument
+    - SQL_INSTRUMENTATION_N_PLUS_ONE: repeats of one query that are flagged
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "SQL_INSTRUMENTATION_SAMPLE_RATE", 1.0)
+        self.threshold = getattr(settings, "SQL_INSTRUMENTATION_N_PLUS_ONE", 10)
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with self.recording(recorder):
+            response = self.get_response(request)
+
+        if self.show_timing(request):
+            response["Server-Timing"] = (
+                f"db;dur={recorder.duration * 1000:.1f};"
+                f'desc="{recorder.count} queries"'
+            )
+        if (
+            response.streaming
+            and not response.is_async
+            and not isinstance(response, FileResponse)
+        ):
+            response.streaming_content = self.streamed(
+                response.streaming_content, request, recorder
+            )
+        else:
+            self.report(request, recorder)
+        return response
+
+    @staticmethod
+    def recording(recorder):
+        """
+        context in which the queries of every connection go to recorder
+        """
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    @staticmethod
+    def show_timing(request):
+        """
+        whether the client may see the Server-Timing header
+        """
+        if settings.DEBUG:
+            return True
+        user = getattr(request, "user", None)
+        return bool(user is not None and user.is_staff)
+
+    def streamed(self, content, request, recorder):
+        """
+        content of a streamed response, recording the queries made while it
+        is sent and reporting once it is exhausted
+        """
+        with self.recording(recorder):
+            yield from content
+        self.report(request, recorder)
+
+    def report(self, request, recorder):
+        """
+        log the request's totals and any repeated queries
+        """
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else request.path
+        logger.info(
+            "%s %s: %d queries in %.1fms",
+            request.method,
+            view,
+            recorder.count,
+            recorder.duration * 1000,
+        )
+        for sql, count in recorder.repeated(self.threshold):
+            logger.warning("Possible N+1 in %s: %d x %s", view, count, sql[:500])
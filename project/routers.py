@@ -0,0 +1,83 @@
+"""
+Read replica routing
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA = "replica"
+# apps whose reads may go to the replica; sessions and users stay on the
+# default database, so a fresh login is never missing from a lagging replica
+REPLICA_APPS = {"voyage"}
+
+# set for the duration of a replica_reads() block; a context variable, so
+# it follows async views and sync_to_async threads and never leaks between
+# concurrent requests
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def replica_configured():
+    """
+    whether a replica database is configured
+    """
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def replica_reads():
+    """
+    send the reads of the block to the replica, when one is configured;
+    writes still go to the default database
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reading_replica():
+    """
+    whether reads of REPLICA_APPS models currently go to the replica
+    """
+    return _replica_reads.get() and replica_configured()
+
+
+class ReplicaRouter:
+    """
+    route reads of REPLICA_APPS models inside replica_reads() to the
+    replica and everything else to the default database.
+
+    the replica holds a copy of the default database, so relations between
+    objects read from either are allowed, and migrations only run on the
+    default database; the replica gets its schema through replication.
+    """
+
+    def db_for_read(self, model, **hints):
+        """
+        the replica for REPLICA_APPS inside replica_reads(), else no
+        preference
+        """
+        if model._meta.app_label in REPLICA_APPS and reading_replica():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        """
+        always the default database
+        """
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        both databases hold the same rows
+        """
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        never on the replica
+        """
+        return db != REPLICA
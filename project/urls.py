@@ -13,6 +13,7 @@ urlpatterns = [
     path("", include("qux.auth.urls.appurls", namespace="qux_auth")),
     path("", TemplateView.as_view(template_name="qjango.html"), name="home"),
     path('voyage/', include('apps.voyage.urls.appurls')),
+    path('api/voyage/', include('apps.voyage.urls.apiurls')),
 ]
 
 if settings.DEBUG and ("debug_toolbar" in settings.INSTALLED_APPS):